@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the custom Python libraries
+
+Measures the throughput (calls per second) of the hot paths of the test
+libraries outside Robot Framework: test data generation, config lookups, the
+retry wrapper, metric recording and both message producers. The producers
+publish to in-process fakes, so no broker is needed and only the library's
+own overhead (serialization, bookkeeping, logging) is measured. ``startup.*``
+benchmarks import a library in a fresh interpreter and report imports per
+second, so slower imports fail the same threshold.
+
+Each benchmark is calibrated to run for at least ``--min-time`` seconds per
+round and the best of ``--repeat`` rounds is kept. ``--save-baseline``
+stores the results; later runs compare against them and exit with 1 when a
+benchmark is more than ``--threshold`` slower than its baseline. Baselines
+are machine specific, so create them on the machine that runs the gate.
+
+Example::
+
+    python scripts/benchmark.py --save-baseline
+    python scripts/benchmark.py --threshold 0.2 --filter "config.*"
+"""
+import argparse
+import fnmatch
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LIBRARIES_DIR = REPO_ROOT / 'tests' / 'libraries'
+CONFIG_PATH = str(REPO_ROOT / 'config' / 'config.yaml')
+DEFAULT_BASELINE_PATH = 'history/benchmark_baseline.json'
+
+BENCHMARKS = {}
+
+# Libraries whose import time is measured, each in a fresh interpreter
+STARTUP_MODULES = ('ConfigManager', 'TestDataGenerator', 'RetryDecorator', 'MetricsCollector',
+                   'KafkaProducerLibrary', 'RabbitMQProducerLibrary')
+STARTUP_BENCHMARKS = {f"startup.{module}": module for module in STARTUP_MODULES}
+
+# Robot itself is loaded before any library during a run, so it is not counted
+STARTUP_SCRIPT = ("import sys, time; sys.path.insert(0, {path!r}); import robot.api, robot.api.deco; "
+                  "start = time.perf_counter(); import {module}; print(time.perf_counter() - start)")
+
+
+def benchmark(name):
+    """Register a benchmark: a function doing the setup and returning the callable to time"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+class FakeFuture:
+    """Already resolved send future, like the ones a flushed KafkaProducer hands out"""
+
+    def __init__(self, metadata):
+        self.metadata = metadata
+
+    def get(self, timeout=None):
+        return self.metadata
+
+
+class FakeRecordMetadata:
+
+    def __init__(self, topic, offset):
+        self.topic = topic
+        self.partition = 0
+        self.offset = offset
+        self.timestamp = int(time.time() * 1000)
+
+
+class FakeKafkaProducer:
+    """KafkaProducer stand-in that serializes like the real one and keeps nothing"""
+
+    def __init__(self, value_serializer=None, key_serializer=None, **config):
+        self.value_serializer = value_serializer
+        self.key_serializer = key_serializer
+        self.offset = 0
+        self.bytes_sent = 0
+
+    def send(self, topic, value=None, key=None, headers=None):
+        value = self.value_serializer(value) if self.value_serializer else value
+        key = self.key_serializer(key) if self.key_serializer else key
+        self.bytes_sent += len(value) + len(key or b'')
+        self.offset += 1
+        return FakeFuture(FakeRecordMetadata(topic, self.offset))
+
+    def flush(self, timeout=None):
+        pass
+
+    def bootstrap_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class FakeQueue:
+
+    def __init__(self, queue):
+        self.queue = queue
+
+
+class FakeConfirmFrame:
+
+    def __init__(self, method):
+        self.method = method
+
+
+class FakeAsyncChannel:
+    """Asynchronous pika channel stand-in that acks every delivery on the next event poll"""
+
+    def __init__(self):
+        self.delivery_tag = 0
+        self.confirmed_tag = 0
+        self.on_confirm = None
+
+    def confirm_delivery(self, ack_nack_callback=None, callback=None):
+        import pika.spec
+        self.on_confirm = ack_nack_callback
+        callback(FakeConfirmFrame(pika.spec.Confirm.SelectOk()))
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        self.delivery_tag += 1
+
+    def process_events(self):
+        import pika.spec
+        if self.on_confirm and self.delivery_tag > self.confirmed_tag:
+            # One cumulative ack, as the broker sends under load
+            self.confirmed_tag = self.delivery_tag
+            self.on_confirm(FakeConfirmFrame(pika.spec.Basic.Ack(self.delivery_tag, multiple=True)))
+
+
+class FakeChannel:
+    """pika channel stand-in that accepts every publish"""
+
+    is_open = True
+
+    def __init__(self):
+        self.published = 0
+        self._impl = FakeAsyncChannel()
+
+    def queue_declare(self, queue, durable=True):
+        return type('Result', (), {'method': FakeQueue(queue)})()
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        self.published += 1
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+
+    is_open = True
+
+    def __init__(self):
+        self.opened_channel = None
+
+    def channel(self):
+        self.opened_channel = FakeChannel()
+        return self.opened_channel
+
+    def process_data_events(self, time_limit=0):
+        if self.opened_channel:
+            self.opened_channel._impl.process_events()
+
+    def close(self):
+        pass
+
+
+def _sample_message():
+    return {
+        'test_name': 'Test POST Request With JSON Data',
+        'status': 'PASS',
+        'duration': 0.42,
+        'details': {'endpoint': '/post', 'status_code': 200, 'tags': ['smoke', 'http']}
+    }
+
+
+@benchmark('test_data.user')
+def bench_test_data_user():
+    from TestDataGenerator import TestDataGenerator
+    return TestDataGenerator(seed=42).generate_random_user_data
+
+
+@benchmark('test_data.api')
+def bench_test_data_api():
+    from TestDataGenerator import TestDataGenerator
+    return TestDataGenerator(seed=42).generate_random_api_test_data
+
+
+@benchmark('test_data.json_complex')
+def bench_test_data_json_complex():
+    from TestDataGenerator import TestDataGenerator
+    generator = TestDataGenerator(seed=42)
+    return lambda: generator.generate_random_json_payload('complex')
+
+
+@benchmark('config.get_value')
+def bench_config_get_value():
+    from ConfigManager import ConfigManager
+    config = ConfigManager()
+    config.load_configuration(CONFIG_PATH, env_path='')
+    return lambda: config.get_config_value('monitoring.prometheus.gateway_url')
+
+
+@benchmark('config.get_value_env_fallback')
+def bench_config_get_value_env_fallback():
+    from ConfigManager import ConfigManager
+    config = ConfigManager()
+    config.load_configuration(CONFIG_PATH, env_path='')
+    return lambda: config.get_config_value('api.not_configured', 'default')
+
+
+@benchmark('retry.success')
+def bench_retry_success():
+    from RetryDecorator import RetryDecorator
+    return RetryDecorator(max_attempts=3, delay=0)(lambda: None)
+
+
+@benchmark('retry.one_failure')
+def bench_retry_one_failure():
+    from RetryDecorator import RetryDecorator
+    calls = [0]
+
+    def flaky():
+        calls[0] += 1
+        if calls[0] % 2:
+            raise ConnectionError('connection reset')
+
+    return RetryDecorator(max_attempts=3, delay=0)(flaky)
+
+
+@benchmark('metrics.record_test_execution')
+def bench_metrics_record_test_execution():
+    from MetricsCollector import MetricsCollector
+    metrics = MetricsCollector(CONFIG_PATH)
+    metrics.history_path = None
+    names = [f"Test Case {index}" for index in range(50)]
+    counter = [0]
+
+    def record():
+        counter[0] += 1
+        metrics.record_test_execution(names[counter[0] % len(names)], 'Http Methods Tests', 'PASS', 0.25)
+
+    return record
+
+
+def _large_message():
+    message = _sample_message()
+    message['details']['response'] = [{'id': index, 'name': f"user {index}", 'tags': ['a', 'b', 'c']}
+                                      for index in range(500)]
+    return message
+
+
+def _kafka_library(**codec):
+    import KafkaProducerLibrary
+    KafkaProducerLibrary.kafka = types.SimpleNamespace(KafkaProducer=FakeKafkaProducer)
+    library = KafkaProducerLibrary.KafkaProducerLibrary()
+    library.connect_to_kafka('localhost:9092', **codec)
+    return library
+
+
+@benchmark('kafka.publish_message')
+def bench_kafka_publish_message():
+    library = _kafka_library()
+    message = _sample_message()
+    return lambda: library.publish_message_to_kafka('test-results', message, key='bench')
+
+
+@benchmark('kafka.publish_messages_batch_100')
+def bench_kafka_publish_messages_batch():
+    library = _kafka_library()
+    messages = [_sample_message() for _ in range(100)]
+    return lambda: library.publish_messages_to_kafka('test-results', messages)
+
+
+@benchmark('kafka.publish_large_message')
+def bench_kafka_publish_large_message():
+    library = _kafka_library()
+    message = _large_message()
+    return lambda: library.publish_message_to_kafka('test-results', message, key='bench')
+
+
+@benchmark('kafka.publish_large_message_compact_json')
+def bench_kafka_publish_large_message_compact_json():
+    library = _kafka_library(serializer='compact-json')
+    message = _large_message()
+    return lambda: library.publish_message_to_kafka('test-results', message, key='bench')
+
+
+def _rabbitmq_library():
+    from RabbitMQProducerLibrary import RabbitMQProducerLibrary
+    library = RabbitMQProducerLibrary()
+    library._open_channel = lambda parameters: (FakeConnection(), FakeChannel())
+    library.connect_to_rabbitmq()
+    return library
+
+
+@benchmark('rabbitmq.publish_message')
+def bench_rabbitmq_publish_message():
+    library = _rabbitmq_library()
+    message = _sample_message()
+    return lambda: library.publish_message_to_rabbitmq('test-results', message)
+
+
+@benchmark('rabbitmq.publish_test_result')
+def bench_rabbitmq_publish_test_result():
+    library = _rabbitmq_library()
+    details = _sample_message()['details']
+    return lambda: library.publish_test_result_to_rabbitmq('test-results', 'Test GET Request', 'PASS', 0.3, details)
+
+
+@benchmark('rabbitmq.bulk_publish_100')
+def bench_rabbitmq_bulk_publish_100():
+    library = _rabbitmq_library()
+    messages = [_sample_message() for _ in range(100)]
+    return lambda: library.bulk_publish_messages_to_rabbitmq('test-results', messages, window=20)
+
+
+def measure(func, min_time=0.2, repeat=5):
+    """Return the best calls per second of ``repeat`` rounds lasting at least ``min_time`` each"""
+    number = 1
+    while True:
+        elapsed = _time_calls(func, number)
+        if elapsed >= min_time:
+            break
+        # Aim a bit past min_time so calibration ends in one or two more steps
+        number = max(number * 2, int(number * min_time * 1.2 / max(elapsed, 1e-9)))
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, _time_calls(func, number))
+    return number / best
+
+
+def measure_startup(module, repeat=5):
+    """Return how many times per second ``module`` imports, best of ``repeat`` fresh interpreters"""
+    script = STARTUP_SCRIPT.format(path=str(LIBRARIES_DIR), module=module)
+    best = min(float(subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                                    check=True).stdout) for _ in range(repeat))
+    return 1 / best
+
+
+def _time_calls(func, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def load_baseline(path, loglevel):
+    """Baseline results recorded at the same log level, which changes the libraries' cost a lot"""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get('loglevel', 'INFO') != loglevel:
+        print(f"Baseline {path} was recorded at log level {baseline.get('loglevel')}, not comparing")
+        return {}
+    return baseline.get('results', {})
+
+
+def save_baseline(path, results, loglevel):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'loglevel': loglevel,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+
+
+def compare(results, baseline, threshold):
+    """Return ``(rows, regressions)``; a regression is a benchmark slower than baseline by over ``threshold``"""
+    rows = []
+    regressions = []
+    for name, ops in results.items():
+        reference = baseline.get(name)
+        change = ops / reference - 1 if reference else None
+        rows.append((name, ops, reference, change))
+        if change is not None and change < -threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def print_results(rows, regressions):
+    print(f"{'Benchmark':40} {'ops/s':>12} {'baseline':>12} {'change':>8}")
+    for name, ops, reference, change in rows:
+        reference_text = f"{reference:12.1f}" if reference else f"{'-':>12}"
+        change_text = f"{change:+8.1%}" if change is not None else f"{'-':>8}"
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f"{name:40} {ops:12.1f} {reference_text} {change_text}{flag}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filter', action='append', default=[], help='Glob of benchmark names to run')
+    parser.add_argument('--baseline', default=os.getenv('ROBOT_BENCHMARK_BASELINE', DEFAULT_BASELINE_PATH))
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed throughput drop against the baseline before failing (0-1)')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per round')
+    parser.add_argument('--repeat', type=int, default=5, help='Rounds per benchmark, the best one counts')
+    parser.add_argument('--loglevel', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Level the libraries log at, as with robot --loglevel')
+    parser.add_argument('--output', default=None, help='Also write the results as JSON')
+    parser.add_argument('--list', action='store_true', help='List the benchmarks and exit')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = [name for name in [*BENCHMARKS, *STARTUP_BENCHMARKS]
+             if not args.filter or any(fnmatch.fnmatch(name, p) for p in args.filter)]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+    if not names:
+        print('No benchmarks match the filter')
+        return 1
+
+    sys.path.insert(0, str(LIBRARIES_DIR))
+    # Outside a run robot.api.logger goes to the logging module: gate it like
+    # --loglevel would, but do not print every retry warning to the console
+    logging.getLogger().addHandler(logging.NullHandler())
+    logging.getLogger().setLevel(args.loglevel)
+    results = {}
+    for name in names:
+        if name in STARTUP_BENCHMARKS:
+            ops = measure_startup(STARTUP_BENCHMARKS[name], max(args.repeat, 1))
+        else:
+            ops = measure(BENCHMARKS[name](), args.min_time, max(args.repeat, 1))
+        results[name] = round(ops, 1)
+
+    baseline = load_baseline(args.baseline, args.loglevel)
+    rows, regressions = compare(results, baseline, args.threshold)
+    print_results(rows, regressions)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        # Keep baselines of benchmarks that were filtered out of this run
+        save_baseline(args.baseline, {**baseline, **results}, args.loglevel)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+    elif regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Load-test mode for the existing Robot Framework test cases
+
+Turns the selected test cases of a suite file into keywords and runs each
+of them with ``LoadRunner``'s 'Run Load Test' for ``--duration`` seconds,
+keeping the suite's own setup, teardown, resources and variables. The
+target ``--rps`` is shared by ``--concurrency`` worker processes (one
+virtual user each). Every worker writes its latency samples, and the runner
+merges them into overall p50/p95/p99 latency, throughput and error rate per
+test, printed and written to ``<outputdir>/load_summary.json``. Workers
+observe every iteration in ``MetricsCollector`` and push under their own
+``ROBOT_WORKER_ID``. ``--gateway`` also pushes the merged percentiles.
+Workers share one test data seed (``--data-seed``) with a data stream each,
+so virtual users send different but reproducible data.
+
+Example::
+
+    python scripts/load_runner.py tests/api/http_methods_tests.robot \\
+        --test "Test GET Request With Parameters" --test "Test POST Request With JSON Data" \\
+        --duration 60 --rps 20 --concurrency 4 --data-pool user --data-pool api
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from robot.api import TestSuiteBuilder
+
+LIBRARIES_DIR = Path(__file__).resolve().parent.parent / 'tests' / 'libraries'
+FLOW_PREFIX = 'Load Flow'
+
+
+def build_load_suite(args):
+    """Suite running every selected test body as a load scenario instead of once"""
+    suite = TestSuiteBuilder().build(args.suite)
+    tests = {test.name: test for test in suite.tests}
+    missing = [name for name in args.test if name not in tests]
+    if missing:
+        raise SystemExit(f"Tests not found in {args.suite}: {', '.join(missing)}")
+
+    suite.resource.imports.library(str(LIBRARIES_DIR / 'LoadRunner.py'))
+    worker_rps = args.rps / args.concurrency if args.rps else None
+    load_test = suite.tests.create(name='Load Test')
+    for name in args.test:
+        flow = suite.resource.keywords.create(name=f"{FLOW_PREFIX} {name}")
+        flow.body = tests[name].body
+        load_test.body.create_keyword(name='Run Load Test', args=[
+            flow.name,
+            f"duration={args.duration}",
+            f"rps={worker_rps or ''}",
+            f"scenario={name}",
+            f"data_pools={','.join(args.data_pool)}",
+            f"samples_path={samples_path(args, args.worker_index, name)}"
+        ])
+    suite.tests = [load_test]
+    return suite
+
+
+def samples_path(args, worker_index, test_name):
+    slug = ''.join(char if char.isalnum() else '_' for char in test_name).lower()
+    return Path(args.outputdir) / f"worker-{worker_index}" / f"{slug}.json"
+
+
+def run_worker(args):
+    suite = build_load_suite(args)
+    result = suite.run(output=None, log=None, report=None, loglevel=args.loglevel, console='quiet')
+    return result.return_code
+
+
+def run_workers(args, argv):
+    """Start ``args.concurrency`` worker processes and return their return codes"""
+    def run(index):
+        # Every virtual user gets its own data stream of the shared seed, so they do not send identical data
+        env = dict(os.environ, ROBOT_WORKER_ID=f"load-{index}", ROBOT_DURATION_HISTORY='', ROBOT_LIBRARY_QUIET='1',
+                   ROBOT_DATA_SEED=str(args.data_seed), ROBOT_DATA_STREAM=f"load-{index}")
+        command = [sys.executable, __file__, '--worker-index', str(index)] + argv
+        print(f"Starting load worker {index}")
+        return subprocess.run(command, env=env).returncode
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        return list(pool.map(run, range(args.concurrency)))
+
+
+def merge_samples(args):
+    """Combine the samples of all workers into one summary per test"""
+    from LoadRunner import summarize
+
+    summaries = {}
+    for name in args.test:
+        samples, errors, elapsed = [], {}, 0.0
+        for index in range(args.concurrency):
+            path = samples_path(args, index, name)
+            if not path.exists():
+                continue
+            data = json.loads(path.read_text())
+            samples += [tuple(sample) for sample in data['samples']]
+            for message, count in data['errors'].items():
+                errors[message] = errors.get(message, 0) + count
+            elapsed = max(elapsed, data['summary']['duration'])
+        summaries[name] = summarize(name, samples, errors, elapsed)
+    return summaries
+
+
+def push_summaries(summaries, args):
+    from MetricsCollector import MetricsCollector
+
+    metrics = MetricsCollector()
+    metrics.history_path = None
+    for name, summary in summaries.items():
+        metrics.record_load_test_summary(name, summary)
+    metrics.push_metrics_to_prometheus(args.gateway, args.job_name)
+
+
+def print_summaries(summaries):
+    print(f"{'Test':50} {'iter':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for name, summary in summaries.items():
+        print(f"{name[:50]:50} {summary['iterations']:>7} {summary['rps']:>8} {summary['p50']:>8.3f} "
+              f"{summary['p95']:>8.3f} {summary['p99']:>8.3f} {summary['error_rate']:>7.2%}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('suite', help='Suite file whose test cases are the load scenarios')
+    parser.add_argument('--test', action='append', required=True, help='Test case to run under load')
+    parser.add_argument('--duration', type=float, default=60.0, help='Seconds per test')
+    parser.add_argument('--rps', type=float, default=None, help='Target iterations per second over all workers')
+    parser.add_argument('--concurrency', type=int, default=1, help='Worker processes (virtual users)')
+    parser.add_argument('--data-pool', action='append', default=[], help='TestDataGenerator pool kind to prefill')
+    parser.add_argument('--outputdir', default=os.path.join(os.getenv('ROBOT_REPORTS_DIR', 'reports'), 'load'))
+    parser.add_argument('--loglevel', default='WARN')
+    parser.add_argument('--max-error-rate', type=float, default=None,
+                        help='Fail when a test exceeds this share of failed iterations (0-1)')
+    parser.add_argument('--gateway', default=None, help='Pushgateway URL for the merged summary')
+    parser.add_argument('--job-name', default='robot-load')
+    parser.add_argument('--data-seed', type=int, default=None,
+                        help='Base TestDataGenerator seed (default: ROBOT_DATA_SEED or random, printed)')
+    parser.add_argument('--worker-index', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.concurrency = max(args.concurrency, 1)
+    return args
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = parse_args(argv)
+    if args.worker_index is not None:
+        return run_worker(args)
+
+    sys.path.insert(0, str(LIBRARIES_DIR))
+    from TestDataGenerator import resolve_data_seed
+
+    args.data_seed = resolve_data_seed(args.data_seed)
+    print(f"Test data seed: {args.data_seed}")
+    return_codes = run_workers(args, argv)
+    summaries = merge_samples(args)
+    print_summaries(summaries)
+    summary_path = Path(args.outputdir) / 'load_summary.json'
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summaries, indent=2))
+    print(f"Load summary: {summary_path}")
+    if args.gateway:
+        push_summaries(summaries, args)
+
+    if args.max_error_rate is not None:
+        over = [name for name, summary in summaries.items() if summary['error_rate'] > args.max_error_rate]
+        for name in over:
+            print(f"Error rate of '{name}' is above {args.max_error_rate:.2%}")
+        if over:
+            return 1
+    return 0 if all(rc == 0 for rc in return_codes) and summaries else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
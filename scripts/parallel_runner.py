@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Parallel Robot Framework test execution
+
+Splits the API suites into jobs, runs each job as its own ``robot`` process
+across a worker pool, merges the per-job outputs into a single ``output.xml``
+(plus log and report) and exits with one combined return code.
+
+Every worker gets a ``ROBOT_WORKER_ID`` environment variable, used e.g. by
+``MetricsCollector`` to push under its own Pushgateway grouping key. See
+``--help`` for the split modes and other options.
+
+Example::
+
+    python scripts/parallel_runner.py --processes 4 --split balanced --include smoke
+"""
+import argparse
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from robot import rebot
+from robot.api import TestSuiteBuilder
+
+from result_index import build_index, print_failure, print_summary, return_code, summarize, write_index
+from test_scheduler import DEFAULT_DURATION, load_history, schedule
+
+# robot return codes of 251 and above mean the run itself broke
+ROBOT_ERROR_RC = 251
+
+LIBRARIES_DIR = Path(__file__).resolve().parent.parent / 'tests' / 'libraries'
+PROFILER_LISTENER = 'tests/libraries/KeywordProfiler.py'
+
+
+class Job:
+    """One ``robot`` invocation: suite files plus the filters selecting their tests"""
+
+    def __init__(self, name, suites, include=(), exclude=(), tests=()):
+        self.name = name
+        self.suites = list(suites)
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.tests = list(tests)
+
+    def command(self, args, output):
+        command = [
+            sys.executable, '-m', 'robot',
+            '--output', str(output),
+            '--log', 'NONE',
+            '--report', 'NONE',
+            '--loglevel', args.loglevel,
+            '--pythonpath', '.',
+            '--runemptysuite',
+        ]
+        for listener in args.listener:
+            command += ['--listener', listener]
+        for tag in self.include:
+            command += ['--include', tag]
+        for tag in self.exclude:
+            command += ['--exclude', tag]
+        if len(self.suites) > 1:
+            # Several suites run under a parent suite named after the job,
+            # which becomes part of every test's full name
+            command += ['--name', self.name]
+        for test in self.tests:
+            command += ['--test', f"{self.name}.{test}" if len(self.suites) > 1 else test]
+        return command + [str(suite) for suite in self.suites]
+
+
+def discover_suites(tests_dir):
+    return sorted(Path(tests_dir).glob('*.robot'))
+
+
+def discover_tests(suite, include=(), exclude=()):
+    """Return the tests in a suite file matching the tag filters"""
+    built = TestSuiteBuilder().build(str(suite))
+    built.filter(included_tags=list(include) or None, excluded_tags=list(exclude) or None)
+    return list(built.all_tests)
+
+
+def build_balanced_jobs(args):
+    """Spread all tests over one job per worker using historical durations"""
+    tests = []
+    for suite in discover_suites(args.tests_dir):
+        tests += [(suite, test) for test in discover_tests(suite, args.include, args.exclude)]
+
+    shards = schedule(tests, args.processes, load_history(args.history), args.default_duration,
+                      key=lambda item: item[1].name)
+    jobs = []
+    for index, (estimate, shard) in enumerate(shards):
+        suites = sorted({suite for suite, test in shard})
+        print(f"Shard {index}: {len(shard)} tests, estimated {estimate}s")
+        jobs.append(Job(f"shard-{index}", suites, tests=[test.longname for suite, test in shard]))
+    return jobs
+
+
+def build_jobs(args):
+    if args.split == 'balanced':
+        return build_balanced_jobs(args)
+
+    jobs = []
+    for suite in discover_suites(args.tests_dir):
+        if args.split == 'tests':
+            for index, test in enumerate(discover_tests(suite, args.include, args.exclude)):
+                jobs.append(Job(f"{suite.stem}-{index}", [suite], tests=[test.longname]))
+        elif args.shard_tags:
+            # Each tag shard excludes the earlier ones so no test runs twice. Repeated
+            # --include options are ORed, so the tag is ANDed into each user pattern
+            for index, tag in enumerate(args.shard_tags):
+                include = [f"{pattern}AND{tag}" for pattern in args.include] or [tag]
+                jobs.append(Job(f"{suite.stem}-{tag}", [suite], include, args.exclude + args.shard_tags[:index]))
+            jobs.append(Job(f"{suite.stem}-rest", [suite], args.include, args.exclude + args.shard_tags))
+        else:
+            jobs.append(Job(suite.stem, [suite], args.include, args.exclude))
+    return jobs
+
+
+def run_jobs(jobs, args, tests=None):
+    """Run jobs across ``args.processes`` workers and return ``{job name: (rc, output)}``
+
+    When ``tests`` is given, each finished output is indexed into it and its
+    failures printed while the other workers keep running.
+    """
+    workers_dir = Path(args.outputdir) / 'workers'
+    workers_dir.mkdir(parents=True, exist_ok=True)
+
+    def run(job):
+        output = workers_dir / f"{job.name}.xml"
+        env = dict(os.environ, ROBOT_WORKER_ID=job.name, ROBOT_DATA_SEED=str(args.data_seed))
+        if args.quiet:
+            env['ROBOT_LIBRARY_QUIET'] = '1'
+        print(f"Starting {job.name}")
+        completed = subprocess.run(job.command(args, output), env=env,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        (workers_dir / f"{job.name}.txt").write_text(completed.stdout)
+        print(f"Finished {job.name} (rc={completed.returncode})")
+        if tests is not None and output.exists():
+            tests.update(build_index([output], on_failure=print_failure))
+        return job.name, (completed.returncode, output)
+
+    with ThreadPoolExecutor(max_workers=args.processes) as pool:
+        return dict(pool.map(run, jobs))
+
+
+def merge_outputs(results, args):
+    """Combine worker outputs into one output.xml, log and report; return rebot's rc"""
+    outputs = [str(output) for rc, output in results.values() if output.exists()]
+    if not outputs:
+        return ROBOT_ERROR_RC
+    return rebot(*outputs, name=args.name, outputdir=args.outputdir, output='output.xml',
+                 log='log.html', report='report.html', stdout=sys.stdout)
+
+
+def index_outputs(tests, args):
+    """Write the streamed per-test results and return the run's totals"""
+    totals = summarize(tests)
+    print_summary(totals)
+    index_path = Path(args.outputdir) / 'results_index.json'
+    write_index(tests, index_path)
+    print(f"Result index: {index_path}")
+    return totals
+
+
+def merge_profiles(args):
+    """Sum the workers' collapsed stacks into one flame graph input file"""
+    totals = {}
+    for path in sorted((Path(args.outputdir) / 'profiles').glob('*.folded')):
+        for line in path.read_text(encoding='utf-8').splitlines():
+            stack, _, value = line.rpartition(' ')
+            totals[stack] = totals.get(stack, 0) + int(value)
+    if totals:
+        merged = Path(args.outputdir) / 'keyword_profile.folded'
+        merged.write_text(''.join(f"{stack} {value}\n" for stack, value in totals.items()), encoding='utf-8')
+        print(f"Keyword profile: {merged}")
+
+
+def combined_return_code(results, merge_rc):
+    errors = [rc for rc, output in results.values() if rc >= ROBOT_ERROR_RC or not output.exists()]
+    if errors:
+        return max(errors + [ROBOT_ERROR_RC])
+    return merge_rc
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tests-dir', default=os.getenv('ROBOT_TESTS_DIR', 'tests/api'))
+    parser.add_argument('--outputdir', default=os.getenv('ROBOT_REPORTS_DIR', 'reports'))
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--split', choices=['suites', 'tests', 'balanced'], default='suites',
+                        help='One job per suite, per test, or one duration-balanced shard per process')
+    parser.add_argument('--shard-tags', default='', help='Comma separated tags, one job per tag per suite')
+    parser.add_argument('--include', action='append', default=[])
+    parser.add_argument('--exclude', action='append', default=[])
+    parser.add_argument('--listener', action='append', default=[])
+    parser.add_argument('--history', default=None, help='Duration history file for --split balanced')
+    parser.add_argument('--default-duration', type=float, default=DEFAULT_DURATION,
+                        help='Estimated seconds for tests without history')
+    parser.add_argument('--loglevel', default='INFO')
+    parser.add_argument('--quiet', action='store_true',
+                        help='Only log WARN and above from the custom libraries (ROBOT_LIBRARY_QUIET)')
+    parser.add_argument('--name', default='Robot Tests')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile keyword and HTTP call wall time into keyword_profile.folded')
+    parser.add_argument('--data-seed', type=int, default=None,
+                        help='Base TestDataGenerator seed (default: ROBOT_DATA_SEED or random, printed)')
+    parser.add_argument('--skip-rebot', action='store_true',
+                        help='Only write the streamed results index, without merged output.xml, log and report; '
+                             'the return code comes from the index')
+    args = parser.parse_args(argv)
+    if args.profile:
+        args.listener.append(f"{PROFILER_LISTENER}:{Path(args.outputdir) / 'profiles'}")
+    args.shard_tags = [tag for tag in args.shard_tags.split(',') if tag]
+    args.processes = max(args.processes, 1)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.path.insert(0, str(LIBRARIES_DIR))
+    from TestDataGenerator import resolve_data_seed
+
+    jobs = build_jobs(args)
+    args.data_seed = resolve_data_seed(args.data_seed)
+    print(f"Running {len(jobs)} jobs on {args.processes} workers with test data seed {args.data_seed}")
+    tests = {}
+    results = run_jobs(jobs, args, tests)
+    totals = index_outputs(tests, args)
+    if args.skip_rebot:
+        merge_rc = return_code(totals) if tests else ROBOT_ERROR_RC
+    else:
+        merge_rc = merge_outputs(results, args)
+    if args.profile:
+        merge_profiles(args)
+    return combined_return_code(results, merge_rc)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
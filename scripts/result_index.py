@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Streaming summary of Robot Framework output files
+
+Reads any number of ``output.xml`` files with ``iterparse`` and keeps only
+one test element in memory at a time, so large parallel runs are summarized
+in seconds instead of waiting for rebot to load every output. Failures are
+printed as soon as they are parsed. The merged per-test status and duration
+go to a compact JSON index (or Parquet, when the path ends in ``.parquet``
+and pyarrow is installed). A test found in several outputs keeps its last
+result, like ``rebot --merge``.
+
+Example::
+
+    python scripts/result_index.py reports/workers/*.xml --index reports/results_index.json
+"""
+import argparse
+import json
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+
+# Same cap as robot's return code, which counts failed tests
+MAX_FAILED_RC = 250
+
+RF6_TIME_FORMAT = '%Y%m%d %H:%M:%S.%f'
+
+
+def iter_tests(path):
+    """Yield one dict per test in an output file, in file order
+
+    Test elements are cleared once read, and suites once finished, so memory
+    stays flat however many keywords the output holds.
+    """
+    suites = []
+    context = ET.iterparse(str(path), events=('start', 'end'))
+    for event, element in context:
+        if event == 'start':
+            if element.tag == 'suite':
+                suites.append(element.get('name', ''))
+            continue
+        if element.tag == 'test':
+            yield _test_record(element, suites, path)
+            element.clear()
+        elif element.tag == 'suite':
+            suites.pop()
+            element.clear()
+
+
+def _test_record(element, suites, path):
+    status = element.find('status')
+    tags = [tag.text for tag in element.findall('tag')] + [tag.text for tag in element.findall('tags/tag')]
+    record = {
+        'name': '.'.join(suites + [element.get('name', '')]),
+        'status': status.get('status') if status is not None else 'NOT RUN',
+        'elapsed': _elapsed(status),
+        'source': str(path)
+    }
+    if tags:
+        record['tags'] = tags
+    if status is not None and status.text and record['status'] != 'PASS':
+        record['message'] = status.text
+    return record
+
+
+def _elapsed(status):
+    """Test duration in seconds from a robot 7 ``elapsed`` or robot 6 start/end time"""
+    if status is None:
+        return 0.0
+    if status.get('elapsed') is not None:
+        return round(float(status.get('elapsed')), 3)
+    start, end = status.get('starttime'), status.get('endtime')
+    try:
+        delta = datetime.strptime(end, RF6_TIME_FORMAT) - datetime.strptime(start, RF6_TIME_FORMAT)
+    except (TypeError, ValueError):
+        return 0.0
+    return round(delta.total_seconds(), 3)
+
+
+def build_index(paths, on_failure=None):
+    """Merge the tests of all outputs into ``{test name: record}``
+
+    ``on_failure`` is called with each failed record as soon as it is parsed.
+    Unreadable outputs, such as the one of a worker killed mid-write, are
+    reported and skipped with the tests read so far kept.
+    """
+    tests = {}
+    for path in paths:
+        try:
+            for record in iter_tests(path):
+                tests[record['name']] = record
+                if on_failure and record['status'] == 'FAIL':
+                    on_failure(record)
+        except (ET.ParseError, OSError) as e:
+            print(f"Could not read {path} completely: {e}", file=sys.stderr)
+    return tests
+
+
+def summarize(tests):
+    totals = {'total': len(tests), 'pass': 0, 'fail': 0, 'skip': 0, 'not_run': 0, 'elapsed': 0.0}
+    for record in tests.values():
+        key = record['status'].lower().replace(' ', '_')
+        totals[key] = totals.get(key, 0) + 1
+        totals['elapsed'] += record['elapsed']
+    totals['elapsed'] = round(totals['elapsed'], 3)
+    return totals
+
+
+def write_index(tests, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.parquet':
+        _write_parquet(tests, path)
+        return
+    index = {
+        'generated': datetime.now().isoformat(),
+        'summary': summarize(tests),
+        'tests': list(tests.values())
+    }
+    path.write_text(json.dumps(index, separators=(',', ':')), encoding='utf-8')
+
+
+def _write_parquet(tests, path):
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit('Parquet indexes need the pyarrow package: pip install pyarrow')
+    columns = ['name', 'status', 'elapsed', 'source', 'tags', 'message']
+    table = pyarrow.table({column: [record.get(column) for record in tests.values()] for column in columns})
+    pyarrow.parquet.write_table(table, str(path))
+
+
+def print_failure(record):
+    message = (record.get('message') or '').splitlines()
+    print(f"FAIL {record['name']} ({record['elapsed']}s){': ' + message[0] if message else ''}")
+
+
+def print_summary(totals):
+    print(f"{totals['total']} tests, {totals['pass']} passed, {totals['fail']} failed, "
+          f"{totals['skip']} skipped in {totals['elapsed']}s of test time")
+
+
+def return_code(totals):
+    """Failed tests capped like robot's return code, 0 when everything passed"""
+    return min(totals['fail'], MAX_FAILED_RC)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('outputs', nargs='+', help='output.xml files to summarize')
+    parser.add_argument('--index', default=None, help='Write the merged index here (.json or .parquet)')
+    parser.add_argument('--quiet', action='store_true', help='Only print the summary line')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    tests = build_index(args.outputs, on_failure=None if args.quiet else print_failure)
+    totals = summarize(tests)
+    print_summary(totals)
+    if args.index:
+        write_index(tests, args.index)
+        print(f"Result index: {args.index}")
+    return return_code(totals)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
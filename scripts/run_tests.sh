@@ -21,46 +21,20 @@ echo -e "${BLUE}Starting Robot Framework Test Execution${NC}"
 mkdir -p "$ROBOT_REPORTS_DIR"
 mkdir -p "$ALLURE_RESULTS_DIR"
 
-# Function to run tests with different configurations
-run_tests() {
-    local test_suite="$1"
-    local tags="$2"
-    local output_name="$3"
-
-    echo -e "${YELLOW}Running $test_suite with tags: $tags${NC}"
-
-    robot \
-        --listener allure_robotframework \
-        --outputdir "$ROBOT_REPORTS_DIR" \
-        --output "$output_name.xml" \
-        --log "$output_name.html" \
-        --report "$output_name-report.html" \
-        --include "$tags" \
-        --loglevel INFO \
-        --pythonpath . \
-        "$ROBOT_TESTS_DIR/$test_suite" || true
-}
-
-# Run test suites
+# Run test suites in parallel; the runner indexes every worker output as it finishes and merges them into output.xml
 echo -e "${BLUE}Executing test suites...${NC}"
 
-# Run smoke tests first
-run_tests "http_methods_tests.robot" "smoke" "smoke-tests"
-
-# Run all HTTP method tests
-run_tests "http_methods_tests.robot" "http_methods" "http-methods"
-
-# Run response format tests
-run_tests "response_formats_tests.robot" "response_formats" "response-formats"
-
-# Run authentication and status tests
-run_tests "auth_status_tests.robot" "auth" "auth-status"
-
-# Run dynamic data tests
-run_tests "dynamic_data_tests.robot" "dynamic_data" "dynamic-data"
-
-# Run messaging tests (if services available)
-run_tests "messaging_tests.robot" "messaging" "messaging"
+set +e
+python scripts/parallel_runner.py \
+    --tests-dir "$ROBOT_TESTS_DIR" \
+    --outputdir "$ROBOT_REPORTS_DIR" \
+    --processes "${ROBOT_PROCESSES:-4}" \
+    --shard-tags "${ROBOT_SHARD_TAGS:-smoke}" \
+    --listener allure_robotframework \
+    ${ROBOT_PROFILE:+--profile} \
+    ${ROBOT_SKIP_REBOT:+--skip-rebot}
+TEST_EXIT_CODE=$?
+set -e
 
 # Generate Allure report
 echo -e "${YELLOW}Generating Allure report...${NC}"
@@ -78,13 +52,9 @@ echo -e "  - Robot Framework: ${GREEN}$ROBOT_REPORTS_DIR/${NC}"
 echo -e "  - Allure Reports: ${GREEN}$ROBOT_REPORTS_DIR/allure-reports/${NC}"
 
 # Return appropriate exit code
-if [ -f "$ROBOT_REPORTS_DIR/output.xml" ]; then
-    # Check if there were any failures
-    if grep -q 'stat="FAIL"' "$ROBOT_REPORTS_DIR"/*.xml 2>/dev/null; then
-        echo -e "${RED}Some tests failed. Check the reports for details.${NC}"
-        exit 1
-    else
-        echo -e "${GREEN}All tests passed!${NC}"
-        exit 0
-    fi
+if [ "$TEST_EXIT_CODE" -ne 0 ]; then
+    echo -e "${RED}Some tests failed. Check the reports for details.${NC}"
+else
+    echo -e "${GREEN}All tests passed!${NC}"
 fi
+exit "$TEST_EXIT_CODE"
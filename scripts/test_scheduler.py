@@ -0,0 +1,58 @@
+"""Duration-aware test scheduling
+
+Reads the per-test duration history that ``MetricsCollector`` appends to on
+every ``Record Test Execution`` and splits tests across workers with the
+longest-processing-time-first heuristic, so shards finish at about the same
+time. Tests without history are estimated with a default duration.
+"""
+import heapq
+import json
+import os
+from pathlib import Path
+
+DEFAULT_HISTORY_PATH = 'history/test_durations.jsonl'
+DEFAULT_DURATION = 10.0
+
+
+def history_path():
+    return Path(os.getenv('ROBOT_DURATION_HISTORY', DEFAULT_HISTORY_PATH))
+
+
+def load_history(path=None, window=5):
+    """Return ``{test name: average duration}`` over the last ``window`` runs of each test"""
+    path = Path(path) if path else history_path()
+    runs = {}
+    if not path.exists():
+        return {}
+
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                runs.setdefault(entry['test'], []).append(float(entry['duration']))
+            except (ValueError, KeyError, TypeError):
+                # A worker killed mid-write can leave a partial last line
+                continue
+
+    return {test: sum(durations[-window:]) / len(durations[-window:]) for test, durations in runs.items()}
+
+
+def schedule(tests, workers, history=None, default_duration=DEFAULT_DURATION, key=lambda test: test):
+    """Split ``tests`` into ``workers`` shards using longest-processing-time-first
+
+    ``key`` maps a test to the name used in the history. Returns a list of
+    ``(estimated seconds, [tests])`` pairs, one per worker, busiest first.
+    """
+    history = history or {}
+    workers = max(int(workers), 1)
+    estimated = sorted(((history.get(key(test), default_duration), index, test)
+                        for index, test in enumerate(tests)), key=lambda item: (-item[0], item[1]))
+
+    shards = [(0.0, worker, []) for worker in range(workers)]
+    heapq.heapify(shards)
+    for duration, index, test in estimated:
+        load, worker, assigned = heapq.heappop(shards)
+        assigned.append(test)
+        heapq.heappush(shards, (load + duration, worker, assigned))
+
+    return [(round(load, 3), assigned) for load, worker, assigned in sorted(shards, reverse=True) if assigned]
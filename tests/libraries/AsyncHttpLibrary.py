@@ -0,0 +1,122 @@
+import asyncio
+import time
+from robot.api.deco import keyword
+from robot.api import logger
+from LazyImport import lazy_import
+
+# Only imported when a session is created, so suites that never use it load without httpx
+httpx = lazy_import('httpx')
+
+class AsyncHttpLibrary:
+    """Concurrent HTTP requests over pooled asyncio clients for Robot Framework"""
+    
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+    
+    def __init__(self):
+        self.loop = None
+        self.sessions = {}
+    
+    @keyword('Create Async Session')
+    def create_async_session(self, alias, base_url, timeout=30, max_connections=20, headers=None, verify=True):
+        """Create a pooled asynchronous HTTP client under ``alias``
+        
+        Connections (and TLS sessions) are kept alive and reused by every
+        request sent through the session.
+        """
+        if alias in self.sessions:
+            self.close_async_session(alias)
+        
+        try:
+            limits = httpx.Limits(max_connections=int(max_connections), max_keepalive_connections=int(max_connections))
+            self.sessions[alias] = httpx.AsyncClient(
+                base_url=base_url,
+                timeout=float(timeout),
+                limits=limits,
+                headers=headers or {},
+                verify=verify
+            )
+            logger.info(f"Created async session '{alias}' for {base_url}")
+        
+        except Exception as e:
+            logger.error(f"Failed to create async session '{alias}': {str(e)}")
+            raise
+    
+    @keyword('Send Requests Concurrently')
+    def send_requests_concurrently(self, alias, requests, concurrency=10, return_exceptions=False):
+        """Send a list of requests concurrently and return the responses in the same order
+        
+        Each request is a dictionary with ``method`` (default GET) and ``url``
+        plus any of ``params``, ``json``, ``data``, ``headers`` and
+        ``expected_status``. At most ``concurrency`` requests are in flight at
+        once. Status mismatches are reported together after all requests
+        finished. Transport errors are raised, or returned in place of the
+        response with ``return_exceptions``.
+        """
+        client = self._get_session(alias)
+        requests = list(requests)
+        start_time = time.monotonic()
+        
+        results = self._run(self._send_all(client, requests, int(concurrency)))
+        
+        duration = time.monotonic() - start_time
+        logger.info(f"Sent {len(requests)} requests concurrently through '{alias}' in {duration:.3f}s")
+        
+        errors = []
+        for index, (request, result) in enumerate(zip(requests, results)):
+            if isinstance(result, Exception):
+                if not return_exceptions:
+                    errors.append(f"request {index} ({request.get('method', 'GET')} {request['url']}): {str(result)}")
+                continue
+            expected = request.get('expected_status')
+            if expected is not None and str(expected) != 'any' and int(expected) != result.status_code:
+                errors.append(f"request {index} ({request.get('method', 'GET')} {request['url']}): "
+                              f"expected status {expected}, got {result.status_code}")
+        
+        if errors:
+            raise AssertionError("Concurrent requests failed:\n" + "\n".join(errors))
+        return results
+    
+    @keyword('Close Async Session')
+    def close_async_session(self, alias):
+        """Close an async session and its pooled connections"""
+        client = self.sessions.pop(alias, None)
+        if client:
+            self._run(client.aclose())
+            logger.info(f"Closed async session '{alias}'")
+    
+    @keyword('Delete All Async Sessions')
+    def delete_all_async_sessions(self):
+        """Close every async session"""
+        for alias in list(self.sessions):
+            self.close_async_session(alias)
+        if self.loop:
+            self.loop.close()
+            self.loop = None
+    
+    def _get_session(self, alias):
+        if alias not in self.sessions:
+            raise RuntimeError(f"Async session '{alias}' not found. Use 'Create Async Session' first.")
+        return self.sessions[alias]
+    
+    def _run(self, coroutine):
+        # Clients are bound to the loop they were first used on, so keep one
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+        return self.loop.run_until_complete(coroutine)
+    
+    @staticmethod
+    async def _send_all(client, requests, concurrency):
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        
+        async def send(request):
+            async with semaphore:
+                return await client.request(
+                    request.get('method', 'GET').upper(),
+                    request['url'],
+                    params=request.get('params'),
+                    json=request.get('json'),
+                    data=request.get('data'),
+                    headers=request.get('headers')
+                )
+        
+        return await asyncio.gather(*(send(request) for request in requests), return_exceptions=True)
@@ -0,0 +1,222 @@
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from robot.api.deco import keyword
+from robot.api import logger
+from LazyImport import lazy_import
+
+# Only imported when a payload is generated
+np = lazy_import('numpy')
+
+FEATURES = ['analytics', 'caching', 'logging', 'monitoring']
+THEMES = ['dark', 'light']
+
+# String columns are stored as indexes into a Faker vocabulary field
+STRING_COLUMNS = {
+    'name': 'name',
+    'message': 'sentence',
+    'user.profile.name': 'name',
+    'user.profile.email': 'email',
+    'users.name': 'name',
+    'users.contacts': 'email'
+}
+
+class Vocabulary:
+    """Faker values generated once per run and picked from by index"""
+    
+    def __init__(self, locale='en_US', size=1000, seed=None):
+        from faker import Faker
+        fake = Faker(locale)
+        if seed is not None:
+            fake.seed_instance(seed)
+        self.size = size
+        self.values = {
+            'name': [fake.name() for _ in range(size)],
+            'email': [fake.email() for _ in range(size)],
+            'sentence': [fake.sentence() for _ in range(size)]
+        }
+        # Pre-encoded JSON literals, so NDJSON lines need no json.dumps per record
+        self.literals = {field: [json.dumps(value) for value in values] for field, values in self.values.items()}
+
+def _simple_columns(rng, count, vocab_size):
+    return {
+        'id': rng.integers(1, 10001, count),
+        'name': rng.integers(0, vocab_size, count),
+        'message': rng.integers(0, vocab_size, count)
+    }
+
+def _medium_columns(rng, count, vocab_size):
+    return {
+        'user.id': rng.integers(1, 10001, count),
+        'user.profile.name': rng.integers(0, vocab_size, count),
+        'user.profile.email': rng.integers(0, vocab_size, count),
+        'user.profile.preferences.theme': rng.integers(0, len(THEMES), count),
+        'user.profile.preferences.notifications': rng.random(count) < 0.5,
+        'metadata.timestamp': np.full(count, int(time.time()), dtype=np.int64),
+        'metadata.version_major': rng.integers(1, 6, count),
+        'metadata.version_minor': rng.integers(0, 10, count)
+    }
+
+def _complex_columns(rng, count, vocab_size):
+    users_count = rng.integers(2, 6, count)
+    total_users = int(users_count.sum())
+    contacts_count = rng.integers(1, 6, total_users)
+    columns = {
+        'users_count': users_count,
+        'users.id': rng.integers(1, 1001, total_users),
+        'users.name': rng.integers(0, vocab_size, total_users),
+        'users.contacts_count': contacts_count,
+        'users.contacts': rng.integers(0, vocab_size, int(contacts_count.sum())),
+        'settings.global.timeout': rng.integers(10, 301, count),
+        'settings.global.retries': rng.integers(1, 11, count)
+    }
+    for feature in FEATURES:
+        columns[f'settings.features.{feature}'] = rng.random(count) < 0.5
+    return columns
+
+TEMPLATES = {
+    'simple': _simple_columns,
+    'medium': _medium_columns,
+    'complex': _complex_columns
+}
+
+def _json_bools(values):
+    return np.where(values, 'true', 'false').tolist()
+
+def _simple_lines(columns, vocab):
+    names, sentences = vocab.literals['name'], vocab.literals['sentence']
+    return ['{"id": %d, "name": %s, "message": %s}' % (record_id, names[name], sentences[message])
+            for record_id, name, message in zip(columns['id'].tolist(), columns['name'].tolist(),
+                                                columns['message'].tolist())]
+
+def _medium_lines(columns, vocab):
+    names, emails = vocab.literals['name'], vocab.literals['email']
+    timestamps = {value: datetime.fromtimestamp(value).isoformat()
+                  for value in np.unique(columns['metadata.timestamp']).tolist()}
+    template = ('{"user": {"id": %d, "profile": {"name": %s, "email": %s, "preferences": '
+                '{"theme": "%s", "notifications": %s}}}, "metadata": {"timestamp": "%s", "version": "%d.%d"}}')
+    return [template % (user_id, names[name], emails[email], THEMES[theme], notifications, timestamps[timestamp],
+                        major, minor)
+            for user_id, name, email, theme, notifications, timestamp, major, minor in zip(
+                columns['user.id'].tolist(),
+                columns['user.profile.name'].tolist(),
+                columns['user.profile.email'].tolist(),
+                columns['user.profile.preferences.theme'].tolist(),
+                _json_bools(columns['user.profile.preferences.notifications']),
+                columns['metadata.timestamp'].tolist(),
+                columns['metadata.version_major'].tolist(),
+                columns['metadata.version_minor'].tolist())]
+
+def _complex_lines(columns, vocab):
+    names, emails = vocab.literals['name'], vocab.literals['email']
+    contacts = [emails[index] for index in columns['users.contacts'].tolist()]
+    contact_ends = np.cumsum(columns['users.contacts_count']).tolist()
+
+    users = []
+    start = 0
+    for user_id, name, end in zip(columns['users.id'].tolist(), columns['users.name'].tolist(), contact_ends):
+        users.append('{"id": %d, "name": %s, "contacts": [%s]}' % (user_id, names[name], ', '.join(contacts[start:end])))
+        start = end
+
+    features = [_json_bools(columns[f'settings.features.{feature}']) for feature in FEATURES]
+    template = ('{"users": [%s], "settings": {"global": {"timeout": %d, "retries": %d}, "features": {'
+                + ', '.join(f'"{feature}": %s' for feature in FEATURES) + '}}}')
+    lines = []
+    start = 0
+    for index, (end, timeout, retries) in enumerate(zip(np.cumsum(columns['users_count']).tolist(),
+                                                       columns['settings.global.timeout'].tolist(),
+                                                       columns['settings.global.retries'].tolist())):
+        lines.append(template % (', '.join(users[start:end]), timeout, retries,
+                                 *(values[index] for values in features)))
+        start = end
+    return lines
+
+LINE_FORMATTERS = {
+    'simple': _simple_lines,
+    'medium': _medium_lines,
+    'complex': _complex_lines
+}
+
+class BulkPayloadGenerator:
+    """Vectorized generation of load-scale JSON payload data sets"""
+    
+    def __init__(self, locale='en_US'):
+        self.locale = locale
+    
+    @keyword('Generate Bulk Payloads')
+    def generate_bulk_payloads(self, output_path, count=100000, complexity='simple', output_format='ndjson',
+                               batch_size=50000, seed=None, vocabulary_size=1000):
+        """Generate ``count`` payloads shaped like 'Generate Random JSON Payload' into a file
+        
+        Numeric and boolean fields are drawn in batches with NumPy and text
+        fields are picked from a vocabulary generated once with Faker.
+        ``output_format`` is ``ndjson`` (one JSON document per line) or ``npz``
+        (one NumPy array per column, text columns as vocabulary indexes with
+        the vocabularies stored as ``vocab.<field>``; ``.npz`` is appended to
+        ``output_path`` when missing). The same ``seed``
+        always produces the same data set, apart from the generation
+        timestamp of ``medium`` payloads.
+        """
+        if complexity not in TEMPLATES:
+            raise ValueError(f"Unknown complexity '{complexity}', expected one of {sorted(TEMPLATES)}")
+        if output_format not in ('ndjson', 'npz'):
+            raise ValueError(f"Unknown output format '{output_format}', expected 'ndjson' or 'npz'")
+        
+        count = int(count)
+        batch_size = max(int(batch_size), 1)
+        seed = None if seed is None else int(seed)
+        start_time = time.monotonic()
+        
+        vocab = Vocabulary(self.locale, int(vocabulary_size), seed)
+        rng = np.random.default_rng(seed)
+        path = Path(output_path)
+        if output_format == 'npz' and path.suffix != '.npz':
+            # np.savez_compressed would append it anyway, the summary reports the real file
+            path = path.with_name(path.name + '.npz')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        batches = self._iter_column_batches(rng, complexity, count, batch_size, vocab.size)
+        if output_format == 'ndjson':
+            self._write_ndjson(path, batches, LINE_FORMATTERS[complexity], vocab)
+        else:
+            self._write_npz(path, batches, vocab)
+        
+        duration = time.monotonic() - start_time
+        summary = {
+            'path': str(path),
+            'format': output_format,
+            'complexity': complexity,
+            'records': count,
+            'seconds': round(duration, 3),
+            'records_per_second': round(count / duration, 1) if duration > 0 else float(count)
+        }
+        logger.info(f"Generated {count} {complexity} payloads into {path} at {summary['records_per_second']} records/s")
+        return summary
+    
+    @staticmethod
+    def _iter_column_batches(rng, complexity, count, batch_size, vocab_size):
+        generate = TEMPLATES[complexity]
+        for offset in range(0, count, batch_size):
+            yield generate(rng, min(batch_size, count - offset), vocab_size)
+    
+    @staticmethod
+    def _write_ndjson(path, batches, format_lines, vocab):
+        with open(path, 'w', encoding='utf-8') as f:
+            for columns in batches:
+                f.write('\n'.join(format_lines(columns, vocab)))
+                f.write('\n')
+    
+    @staticmethod
+    def _write_npz(path, batches, vocab):
+        collected = {}
+        for columns in batches:
+            for name, values in columns.items():
+                collected.setdefault(name, []).append(values)
+        
+        arrays = {name: np.concatenate(parts) for name, parts in collected.items()}
+        for field, values in vocab.values.items():
+            arrays[f'vocab.{field}'] = np.array(values)
+        arrays['vocab.columns'] = np.array(json.dumps(
+            {name: field for name, field in STRING_COLUMNS.items() if name in arrays}))
+        np.savez_compressed(path, **arrays)
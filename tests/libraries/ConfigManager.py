@@ -1,10 +1,27 @@
 import os
+import copy
 import yaml
 import json
 from pathlib import Path
 from dotenv import load_dotenv
 from robot.api.deco import keyword
 from robot.api import logger
+import LibraryLogger as log
+
+# Parsed YAML files shared by all instances, keyed by path: (mtime_ns, config)
+_parsed_files = {}
+
+def _flatten(value, prefix=''):
+    """Index every dict node reachable with dot notation under its full key path"""
+    index = {}
+    if isinstance(value, dict):
+        for key, child in value.items():
+            # Only keys a dotted path can address are indexed, as with the old dict walk
+            if isinstance(key, str) and '.' not in key:
+                path = f"{prefix}.{key}" if prefix else key
+                index[path] = child
+                index.update(_flatten(child, path))
+    return index
 
 class ConfigManager:
     """Configuration management library for Robot Framework"""
@@ -12,10 +29,17 @@ class ConfigManager:
     def __init__(self):
         self.config = {}
         self.env_loaded = False
+        self.loaded_from = None
+        self._index = {}
+        self._env_keys = {}
         
     @keyword('Load Configuration')
     def load_configuration(self, config_path='config/config.yaml', env_path='.env'):
-        """Load configuration from YAML and environment files"""
+        """Load configuration from YAML and environment files
+
+        Loading a file that has not changed since the last load is a no-op,
+        values set with 'Set Config Value' are kept in that case.
+        """
         try:
             # Load .env file
             if os.path.exists(env_path) and not self.env_loaded:
@@ -25,9 +49,22 @@ class ConfigManager:
             
             # Load YAML config
             if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    self.config = yaml.safe_load(f)
-                logger.info(f"Loaded configuration from {config_path}")
+                path = os.path.abspath(config_path)
+                mtime = os.stat(path).st_mtime_ns
+                if self.loaded_from == (path, mtime):
+                    log.info("Configuration %s unchanged, not reloading", config_path)
+                    return self.config
+                
+                cached = _parsed_files.get(path)
+                if cached is None or cached[0] != mtime:
+                    with open(config_path, 'r') as f:
+                        cached = _parsed_files[path] = (mtime, yaml.safe_load(f))
+                    logger.info(f"Loaded configuration from {config_path}")
+                
+                # Instances get their own copy, since 'Set Config Value' mutates it
+                self.config = copy.deepcopy(cached[1])
+                self.loaded_from = (path, mtime)
+                self._index = _flatten(self.config)
             else:
                 logger.warn(f"Configuration file {config_path} not found")
                 
@@ -39,26 +76,28 @@ class ConfigManager:
     
     @keyword('Get Config Value')
     def get_config_value(self, key_path, default=None):
-        """Get configuration value using dot notation (e.g., 'api.base_url')"""
+        """Get configuration value using dot notation (e.g., 'api.base_url')
+
+        Falls back to the environment variable named like the upper-cased key
+        path with dots replaced by underscores (e.g. ``API_BASE_URL``).
+        """
         try:
-            keys = key_path.split('.')
-            value = self.config
-            
-            for key in keys:
-                value = value[key]
-                
-            logger.info(f"Retrieved config value for '{key_path}': {value}")
+            value = self._index[key_path]
+            log.info("Retrieved config value for '%s': %s", key_path, value)
             return value
             
-        except (KeyError, TypeError):
-            env_key = key_path.upper().replace('.', '_')
+        except KeyError:
+            env_key = self._env_keys.get(key_path)
+            if env_key is None:
+                env_key = self._env_keys[key_path] = key_path.upper().replace('.', '_')
+            # Read live, so variables set during the run are still honoured
             env_value = os.getenv(env_key, default)
             
             if env_value is not None:
-                logger.info(f"Retrieved environment value for '{env_key}': {env_value}")
+                log.info("Retrieved environment value for '%s': %s", env_key, env_value)
                 return env_value
             
-            logger.warn(f"Config key '{key_path}' not found, using default: {default}")
+            log.warn("Config key '%s' not found, using default: %s", key_path, default)
             return default
     
     @keyword('Set Config Value')
@@ -76,22 +115,37 @@ class ConfigManager:
             
             # Set the value
             config_ref[keys[-1]] = value
-            logger.info(f"Set config value '{key_path}' to: {value}")
+            self._reindex(key_path)
+            log.info("Set config value '%s' to: %s", key_path, value)
             
         except Exception as e:
             logger.error(f"Failed to set config value '{key_path}': {str(e)}")
             raise
     
+    def _reindex(self, key_path):
+        """Refresh the lookup index for a key path and everything below it"""
+        stale = [path for path in self._index if path == key_path or path.startswith(key_path + '.')]
+        for path in stale:
+            del self._index[path]
+        
+        # Parents may have been created on the way down
+        keys = key_path.split('.')
+        node = self.config
+        for depth, key in enumerate(keys):
+            node = node[key]
+            self._index['.'.join(keys[:depth + 1])] = node
+        self._index.update(_flatten(node, key_path))
+    
     @keyword('Get Environment Variable')
     def get_environment_variable(self, var_name, default=None):
         """Get environment variable with optional default"""
         value = os.getenv(var_name, default)
-        logger.info(f"Environment variable '{var_name}': {value}")
+        log.info("Environment variable '%s': %s", var_name, value)
         return value
     
     @keyword('Dump Configuration')
     def dump_configuration(self):
         """Dump current configuration for debugging"""
         config_str = json.dumps(self.config, indent=2)
-        logger.info(f"Current configuration:\n{config_str}")
+        log.info("Current configuration:\n%s", config_str)
         return config_str
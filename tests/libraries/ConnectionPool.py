@@ -0,0 +1,156 @@
+import atexit
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from robot.api import logger
+
+class ThreadSafeProxy:
+    """Serialize every call on a shared client (connection or channel) through a lock"""
+
+    def __init__(self, target, lock):
+        self._target = target
+        self._lock = lock
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def locked(*args, **kwargs):
+            with self._lock:
+                result = attr(*args, **kwargs)
+            if inspect.isgenerator(result):
+                return self._locked_iter(result)
+            return result
+
+        return locked
+
+    def _locked_iter(self, generator):
+        """Hold the lock while each item is produced, not while the caller uses it"""
+        try:
+            while True:
+                with self._lock:
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                yield item
+        finally:
+            with self._lock:
+                generator.close()
+
+def credentials_digest(*values):
+    """Short digest standing in for credentials in pool keys, which end up in reprs and logs"""
+    return hashlib.sha256(repr(values).encode('utf-8')).hexdigest()[:16]
+
+class PooledClient:
+    """Pool entry holding one broker client and its bookkeeping"""
+
+    def __init__(self, client, closer=None):
+        self.client = client
+        self.closer = closer
+        self.lock = threading.RLock()
+        self.borrowers = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            if self.closer:
+                self.closer(self.client)
+        except Exception as e:
+            logger.warn(f"Failed to close pooled connection: {str(e)}")
+
+class ConnectionPool:
+    """Process-wide pool of broker clients keyed by their connection parameters
+
+    A client that fails its health check while others still borrow it is
+    replaced for new borrowers and closed once the last one releases it.
+    Idle clients are only evicted when something is borrowed (or
+    ``evict_idle`` is called); there is no background sweeper, so a pool
+    nobody borrows from again keeps its clients until ``close_all`` at exit.
+    """
+
+    def __init__(self, idle_timeout=300):
+        self.idle_timeout = idle_timeout
+        self.entries = {}
+        # Replaced unhealthy entries still borrowed, by id of their client
+        self.retired = {}
+        self._lock = threading.Lock()
+
+    def borrow(self, key, factory, health_check=None, closer=None):
+        """Return ``(client, lock)`` for ``key``, creating or replacing the client when needed"""
+        self.evict_idle()
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and health_check and not self._is_healthy(entry, health_check):
+                logger.warn(f"Pooled connection for {key[0]} failed its health check, reconnecting")
+                if entry.borrowers:
+                    self.retired[id(entry.client)] = entry
+                else:
+                    entry.close()
+                entry = None
+
+            if entry is None:
+                entry = PooledClient(factory(), closer)
+                self.entries[key] = entry
+                logger.info(f"Opened pooled {key[0]} connection")
+            else:
+                logger.info(f"Reusing pooled {key[0]} connection")
+
+            entry.borrowers += 1
+            entry.last_used = time.monotonic()
+            return entry.client, entry.lock
+
+    def release(self, key, client=None):
+        """Give a borrowed client back to the pool without closing it
+
+        Passing the borrowed ``client`` lets a replaced client be closed once
+        its last borrower is done with it.
+        """
+        with self._lock:
+            retired = self.retired.get(id(client)) if client is not None else None
+            if retired is not None and retired.client is client:
+                retired.borrowers -= 1
+                if retired.borrowers <= 0:
+                    del self.retired[id(client)]
+                    retired.close()
+                return
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry.borrowers = max(entry.borrowers - 1, 0)
+                entry.last_used = time.monotonic()
+
+    def evict_idle(self):
+        """Close clients nobody has borrowed for longer than ``idle_timeout`` seconds"""
+        now = time.monotonic()
+        with self._lock:
+            idle = [key for key, entry in self.entries.items()
+                    if entry.borrowers == 0 and now - entry.last_used > self.idle_timeout]
+            for key in idle:
+                self.entries.pop(key).close()
+                logger.info(f"Evicted idle pooled {key[0]} connection")
+        return len(idle)
+
+    def close_all(self):
+        """Close every pooled client"""
+        with self._lock:
+            entries = list(self.entries.values()) + list(self.retired.values())
+            self.entries, self.retired = {}, {}
+        for entry in entries:
+            entry.close()
+
+    @staticmethod
+    def _is_healthy(entry, health_check):
+        try:
+            with entry.lock:
+                return bool(health_check(entry.client))
+        except Exception:
+            return False
+
+# Shared by every library instance in the process
+shared_pool = ConnectionPool()
+atexit.register(shared_pool.close_all)
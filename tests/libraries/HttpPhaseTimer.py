@@ -0,0 +1,200 @@
+import re
+import socket
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from robot.api.deco import keyword
+from robot.api import logger
+from robot.libraries.BuiltIn import BuiltIn
+
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'download')
+
+# Timings of the request being sent on this thread, filled in by the connection
+_current = threading.local()
+
+def endpoint_of(url):
+    """Path of ``url`` with numeric segments folded, e.g. ``/bytes/512`` -> ``/bytes/{n}``"""
+    return re.sub(r'/\d+(?=/|$)', '/{n}', urlparse(url).path or '/')
+
+class _PhaseTimingMixin:
+    """Times name resolution, TCP connect and TLS handshake of new connections"""
+    
+    def _new_conn(self):
+        timing = getattr(_current, 'timing', None)
+        if timing is None:
+            return super()._new_conn()
+        
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            address = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except OSError:
+            # Let urllib3 resolve again and raise its usual error
+            address = host
+        resolved = time.perf_counter()
+        
+        # Connect to the resolved address so the lookup is not repeated (and timed as connect)
+        self._dns_host = address
+        try:
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = host
+        timing['dns'] = resolved - start
+        timing['connect'] = time.perf_counter() - resolved
+        timing['reused'] = False
+        return sock
+    
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        timing = getattr(_current, 'timing', None)
+        if timing is not None and isinstance(self, HTTPSConnection):
+            timing['tls'] = max(time.perf_counter() - start - timing['dns'] - timing['connect'], 0.0)
+
+class _TimedHTTPConnection(_PhaseTimingMixin, HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_PhaseTimingMixin, HTTPSConnection):
+    pass
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class PhaseTimingAdapter(HTTPAdapter):
+    """Transport adapter that records phase timings of every request it sends
+    
+    ``ttfb`` runs from sending the request to receiving the response
+    headers, ``download`` covers reading the body (not measured for
+    ``stream=True`` requests, whose body is read later by the caller).
+    """
+    
+    def __init__(self, on_timing=None, **kwargs):
+        self.on_timing = on_timing
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool
+        }
+    
+    def send(self, request, stream=False, **kwargs):
+        timing = _current.timing = {'dns': 0.0, 'connect': 0.0, 'tls': 0.0, 'reused': True}
+        start = time.perf_counter()
+        try:
+            response = super().send(request, stream=stream, **kwargs)
+        finally:
+            _current.timing = None
+        headers_at = time.perf_counter()
+        if not stream:
+            # Session.send would read the body right after this anyway
+            response.content
+        finished = time.perf_counter()
+        
+        timing['ttfb'] = max(headers_at - start - timing['dns'] - timing['connect'] - timing['tls'], 0.0)
+        timing['download'] = finished - headers_at if not stream else 0.0
+        timing['total'] = finished - start
+        timing.update(method=request.method, endpoint=endpoint_of(request.url), status=response.status_code)
+        if self.on_timing:
+            self.on_timing(timing)
+        return response
+
+class HttpPhaseTimer:
+    """DNS, connect, TLS, time to first byte and download timings of RequestsLibrary sessions"""
+    
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+    
+    def __init__(self):
+        self.timings = {}
+    
+    @keyword('Enable HTTP Phase Timing')
+    def enable_http_phase_timing(self, session='httpbin', max_records=1000):
+        """Instrument a RequestsLibrary session so every request records its phase timings
+        
+        Keeps the last ``max_records`` timings of the session and feeds them
+        to MetricsCollector when it is imported in the running suite.
+        """
+        try:
+            # Unlike switch(), get_connection leaves RequestsLibrary's current session alone
+            http_session = BuiltIn().get_library_instance('RequestsLibrary')._cache.get_connection(session)
+            records = self.timings[session] = deque(maxlen=int(max_records))
+            metrics = self._metrics_collector()
+            
+            def on_timing(timing):
+                records.append(timing)
+                if metrics:
+                    metrics.record_http_timing(timing['endpoint'], timing)
+            
+            for prefix in ('http://', 'https://'):
+                current = http_session.get_adapter(prefix)
+                http_session.mount(prefix, PhaseTimingAdapter(
+                    on_timing,
+                    pool_connections=current._pool_connections,
+                    pool_maxsize=current._pool_maxsize,
+                    max_retries=current.max_retries,
+                    pool_block=current._pool_block
+                ))
+                current.close()
+            logger.info(f"Enabled HTTP phase timing for session '{session}'")
+        
+        except Exception as e:
+            logger.error(f"Failed to enable HTTP phase timing: {str(e)}")
+            raise
+    
+    @keyword('Get Last Request Timings')
+    def get_last_request_timings(self, session='httpbin'):
+        """Return the phase timings (seconds) and connection reuse flag of the last request"""
+        records = self._records(session)
+        if not records:
+            raise AssertionError(f"No requests timed on session '{session}' yet")
+        return dict(records[-1])
+    
+    @keyword('Get Request Timings')
+    def get_request_timings(self, session='httpbin', endpoint=None):
+        """Return the recorded timings of a session, optionally only those of one endpoint"""
+        return [dict(timing) for timing in self._records(session)
+                if endpoint is None or timing['endpoint'] == endpoint_of(endpoint)]
+    
+    @keyword('Get Request Timing Summary')
+    def get_request_timing_summary(self, session='httpbin'):
+        """Return the average of each phase and the connection reuse ratio per endpoint"""
+        summary = {}
+        for timing in self._records(session):
+            entry = summary.setdefault(timing['endpoint'], {'requests': 0, 'reused': 0, **{p: 0.0 for p in PHASES}})
+            entry['requests'] += 1
+            entry['reused'] += timing['reused']
+            for phase in PHASES:
+                entry[phase] += timing[phase]
+        
+        for entry in summary.values():
+            for phase in PHASES:
+                entry[phase] = round(entry[phase] / entry['requests'], 6)
+            entry['reuse_ratio'] = round(entry.pop('reused') / entry['requests'], 3)
+        logger.info(f"Request timing summary for '{session}': {summary}")
+        return summary
+    
+    @keyword('Clear Request Timings')
+    def clear_request_timings(self, session='httpbin'):
+        """Drop the timings recorded for a session"""
+        self._records(session).clear()
+    
+    def _records(self, session):
+        if session not in self.timings:
+            raise RuntimeError(f"HTTP phase timing is not enabled for session '{session}'. "
+                               f"Use 'Enable HTTP Phase Timing' first.")
+        return self.timings[session]
+    
+    @staticmethod
+    def _metrics_collector():
+        try:
+            return BuiltIn().get_library_instance('MetricsCollector')
+        except Exception:
+            return None
@@ -1,28 +1,64 @@
-import json
+from datetime import datetime
 import logging
-from kafka import KafkaProducer
-from kafka.errors import KafkaError
 from robot.api.deco import keyword
 from robot.api import logger
+from ConnectionPool import credentials_digest, shared_pool
+from LazyImport import lazy_import
+from MessageCodec import MessageCodec, kafka_headers
+
+# Imported on the first 'Connect To Kafka'
+kafka = lazy_import('kafka')
+
+def _result_outbox():
+    try:
+        from robot.libraries.BuiltIn import BuiltIn
+        return BuiltIn().get_library_instance('ResultOutbox')
+    except Exception:
+        raise RuntimeError("ResultOutbox is not imported. Import it and use 'Start Result Outbox' first.")
 
 class KafkaProducerLibrary:
     """Kafka producer library for Robot Framework messaging integration"""
     
     def __init__(self):
         self.producer = None
+        self.pending = []
+        self.pool_key = None
+        self.codec = MessageCodec()
         
     @keyword('Connect To Kafka')
-    def connect_to_kafka(self, bootstrap_servers='localhost:9092', **kwargs):
-        """Connect to Kafka broker"""
+    def connect_to_kafka(self, bootstrap_servers='localhost:9092', pooled=False, serializer='json', compression='none',
+                         compression_level=None, min_compress_size=1024, **kwargs):
+        """Connect to Kafka broker
+
+        With ``pooled`` the producer is borrowed from the process-wide
+        connection pool and shared with every suite using the same settings.
+
+        Messages are encoded with ``serializer`` (json, compact-json or
+        msgpack) and per-message ``compression`` (none, gzip, zstd or lz4, see
+        ``MessageCodec``), announced in ``content-type`` and
+        ``content-encoding`` record headers. Other arguments go to the
+        producer, e.g. ``compression_type=zstd`` compresses whole batches.
+        """
         try:
+            self.codec = MessageCodec(serializer, compression, compression_level, min_compress_size)
             config = {
                 'bootstrap_servers': bootstrap_servers.split(','),
-                'value_serializer': lambda v: json.dumps(v).encode('utf-8'),
                 'key_serializer': lambda k: str(k).encode('utf-8') if k else None,
                 **kwargs
             }
             
-            self.producer = KafkaProducer(**config)
+            if pooled:
+                # kwargs may hold SASL or SSL secrets, so they are only part of the key as a digest
+                self.pool_key = ('kafka', bootstrap_servers,
+                                 credentials_digest(*sorted((k, repr(v)) for k, v in kwargs.items())))
+                self.producer, _ = shared_pool.borrow(
+                    self.pool_key,
+                    lambda: kafka.KafkaProducer(**config),
+                    health_check=lambda producer: producer.bootstrap_connected(),
+                    closer=lambda producer: producer.close()
+                )
+            else:
+                self.producer = kafka.KafkaProducer(**config)
             logger.info(f"Connected to Kafka at {bootstrap_servers}")
             
         except Exception as e:
@@ -36,7 +72,7 @@ class KafkaProducerLibrary:
             raise RuntimeError("Not connected to Kafka. Use 'Connect To Kafka' first.")
         
         try:
-            future = self.producer.send(topic, value=message, key=key)
+            future = self._send(topic, message, key)
             record_metadata = future.get(timeout=10)
             
             logger.info(f"Message published to topic '{topic}' at offset {record_metadata.offset}")
@@ -51,14 +87,107 @@ class KafkaProducerLibrary:
             logger.error(f"Failed to publish message to Kafka: {str(e)}")
             raise
     
+    @keyword('Publish Messages To Kafka')
+    def publish_messages_to_kafka(self, topic, messages, keys=None, fire_and_forget=False, timeout=30):
+        """Publish a batch of messages to Kafka topic with a single flush
+
+        Sends are not awaited one by one: every message is handed to the
+        producer so linger/batch sizing can group them, then the producer is
+        flushed once and the futures are resolved into a per-message report.
+        With fire_and_forget the futures are kept and the call returns right
+        away; use 'Flush Kafka Producer' to collect their report later.
+        """
+        if not self.producer:
+            raise RuntimeError("Not connected to Kafka. Use 'Connect To Kafka' first.")
+        
+        messages = list(messages)
+        keys = list(keys) if keys else [None] * len(messages)
+        if len(keys) != len(messages):
+            raise ValueError(f"Got {len(keys)} keys for {len(messages)} messages")
+        
+        futures = []
+        for index, (message, key) in enumerate(zip(messages, keys)):
+            try:
+                future = self._send(topic, message, key)
+            except Exception as e:
+                future = e
+            futures.append((index, key, future))
+        
+        if fire_and_forget:
+            self.pending.extend(futures)
+            logger.info(f"Queued {len(futures)} messages for topic '{topic}' without waiting")
+            return len(futures)
+        
+        return self._collect_results(futures, timeout)
+    
+    def _send(self, topic, message, key):
+        value, content_type, content_encoding = self.codec.encode(message)
+        return self.producer.send(topic, value=value, key=key, headers=kafka_headers(content_type, content_encoding))
+    
+    @keyword('Flush Kafka Producer')
+    def flush_kafka_producer(self, timeout=30):
+        """Flush pending fire-and-forget messages and return their report"""
+        if not self.producer:
+            raise RuntimeError("Not connected to Kafka. Use 'Connect To Kafka' first.")
+        
+        futures, self.pending = self.pending, []
+        return self._collect_results(futures, timeout)
+    
+    def _collect_results(self, futures, timeout):
+        """Flush the producer once and resolve futures into a per-message report"""
+        try:
+            self.producer.flush(timeout=float(timeout))
+        except Exception as e:
+            logger.warn(f"Kafka flush did not complete: {str(e)}")
+        
+        results = []
+        for index, key, future in futures:
+            result = {'index': index, 'key': key}
+            try:
+                if isinstance(future, Exception):
+                    raise future
+                # Already resolved by the flush, so this does not block
+                record_metadata = future.get(timeout=0)
+                result.update({
+                    'status': 'PASS',
+                    'topic': record_metadata.topic,
+                    'partition': record_metadata.partition,
+                    'offset': record_metadata.offset,
+                    'timestamp': record_metadata.timestamp
+                })
+            except Exception as e:
+                result.update({'status': 'FAIL', 'error': str(e) or type(e).__name__})
+            results.append(result)
+        
+        failed = [r for r in results if r['status'] == 'FAIL']
+        report = {
+            'total': len(results),
+            'succeeded': len(results) - len(failed),
+            'failed': len(failed),
+            'results': results
+        }
+        
+        if failed:
+            logger.warn(f"{len(failed)} of {len(results)} Kafka messages failed to publish")
+        logger.info(f"Published {report['succeeded']} of {len(results)} messages to Kafka")
+        return report
+    
     @keyword('Publish Test Result To Kafka')
-    def publish_test_result_to_kafka(self, topic, test_name, status, duration, details=None):
-        """Publish test result to Kafka"""
+    def publish_test_result_to_kafka(self, topic, test_name, status, duration, details=None, outbox=False):
+        """Publish test result to Kafka
+        
+        With ``outbox`` the result is appended to the running ResultOutbox,
+        which publishes it in the background, and its result id is returned.
+        """
+        if outbox:
+            return _result_outbox().publish_test_result_to_outbox('kafka', topic, test_name, status, duration,
+                                                                  details)
+        
         message = {
             'test_name': test_name,
             'status': status,
             'duration': duration,
-            'timestamp': logger.timestamp(),
+            'timestamp': datetime.now().isoformat(),
             'details': details or {}
         }
         
@@ -68,6 +197,13 @@ class KafkaProducerLibrary:
     def close_kafka_connection(self):
         """Close Kafka producer connection"""
         if self.producer:
-            self.producer.close()
+            if self.pending:
+                self.flush_kafka_producer()
+            if self.pool_key:
+                shared_pool.release(self.pool_key, self.producer)
+                self.pool_key = None
+                logger.info("Kafka connection returned to pool")
+            else:
+                self.producer.close()
+                logger.info("Kafka connection closed")
             self.producer = None
-            logger.info("Kafka connection closed")
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+# Keyword types that are actual keyword calls, as opposed to FOR, IF, TRY and friends
+KEYWORD_TYPES = ('KEYWORD', 'SETUP', 'TEARDOWN')
+
+class KeywordProfiler:
+    """Listener that profiles the wall time of every keyword and HTTP call
+    
+    Usage: ``robot --listener tests/libraries/KeywordProfiler.py:reports/profiles tests/api``
+    
+    Each keyword call is a frame on a stack under its suite and test, and
+    every ``requests`` call made from the main thread becomes an
+    ``HTTP <METHOD> <host>`` frame below the keyword that sent it. On close
+    the self time of each stack is written as collapsed stacks (one
+    ``frame;frame;frame microseconds`` line per stack, the input format of
+    flamegraph.pl and speedscope) together with a JSON summary per frame.
+    Keyword and HTTP timings are also observed in MetricsCollector's
+    ``robot_keyword_duration_seconds`` histogram when the running suite
+    imports it.
+    """
+    
+    ROBOT_LISTENER_API_VERSION = 2
+    
+    def __init__(self, output_dir='reports/profiles', http='True'):
+        self.output_dir = output_dir
+        self.stack = []
+        self.folded = defaultdict(float)
+        self.frames = {}
+        self.metrics = None
+        self._thread = threading.get_ident()
+        self._original_send = None
+        if str(http).lower() not in ('false', 'no', '0'):
+            self._patch_requests()
+    
+    def start_suite(self, name, attrs):
+        self._push(name)
+    
+    def end_suite(self, name, attrs):
+        self._pop()
+    
+    def start_test(self, name, attrs):
+        if self.metrics is None:
+            self.metrics = self._find_metrics_collector()
+        self._push(name)
+    
+    def end_test(self, name, attrs):
+        self._pop()
+    
+    def start_keyword(self, name, attrs):
+        if attrs['type'] in KEYWORD_TYPES:
+            self._push(name, (attrs['kwname'], attrs['libname']))
+        else:
+            self._push(attrs['type'])
+    
+    def end_keyword(self, name, attrs):
+        self._pop()
+    
+    def close(self):
+        if self._original_send:
+            import requests
+            requests.Session.send = self._original_send
+        self._write_profile()
+    
+    def _push(self, name, metric_labels=None):
+        self.stack.append([name, time.perf_counter(), 0.0, metric_labels])
+    
+    def _pop(self):
+        if not self.stack:
+            return
+        name, started, children, metric_labels = self.stack.pop()
+        elapsed = time.perf_counter() - started
+        self_time = max(elapsed - children, 0.0)
+        if self.stack:
+            self.stack[-1][2] += elapsed
+        
+        path = tuple(frame[0] for frame in self.stack) + (name,)
+        self.folded[path] += self_time
+        stats = self.frames.get(name)
+        if stats is None:
+            stats = self.frames[name] = {'calls': 0, 'total': 0.0, 'self': 0.0, 'max': 0.0}
+        stats['calls'] += 1
+        stats['total'] += elapsed
+        stats['self'] += self_time
+        stats['max'] = max(stats['max'], elapsed)
+        
+        if metric_labels and self.metrics:
+            self.metrics.record_keyword_duration(metric_labels[0], metric_labels[1], elapsed)
+    
+    def _patch_requests(self):
+        """Time every ``requests`` call as a frame of the keyword that made it"""
+        try:
+            import requests
+        except ImportError:
+            return
+        
+        original_send = self._original_send = requests.Session.send
+        profiler = self
+        
+        def send(session, request, **kwargs):
+            # Calls from worker threads cannot be placed on the keyword stack
+            if threading.get_ident() != profiler._thread:
+                return original_send(session, request, **kwargs)
+            host = urlparse(request.url).netloc
+            profiler._push(f"HTTP {request.method} {host}", (f"{request.method} {host}", 'HTTP'))
+            try:
+                return original_send(session, request, **kwargs)
+            finally:
+                profiler._pop()
+        
+        requests.Session.send = send
+    
+    @staticmethod
+    def _find_metrics_collector():
+        try:
+            from robot.libraries.BuiltIn import BuiltIn
+            return BuiltIn().get_library_instance('MetricsCollector')
+        except Exception:
+            # Not imported in this suite (yet), look again at the next test
+            return None
+    
+    def _write_profile(self):
+        if not self.folded:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        worker_id = os.getenv('ROBOT_WORKER_ID')
+        stem = os.path.join(self.output_dir, f"keyword_profile-{worker_id}" if worker_id else 'keyword_profile')
+        
+        with open(f"{stem}.folded", 'w', encoding='utf-8') as f:
+            for path, seconds in self.folded.items():
+                microseconds = int(seconds * 1_000_000)
+                if microseconds:
+                    # Semicolons separate frames, so they cannot appear inside one
+                    f.write(f"{';'.join(frame.replace(';', ',') for frame in path)} {microseconds}\n")
+        
+        summary = sorted(({'frame': name, **{key: round(value, 6) for key, value in stats.items()}}
+                          for name, stats in self.frames.items()), key=lambda item: item['self'], reverse=True)
+        with open(f"{stem}.json", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
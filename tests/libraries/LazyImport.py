@@ -0,0 +1,31 @@
+import importlib
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access
+
+    Broker clients and Faker take a good part of a second to import together,
+    while many suites never call the keywords that need them. Libraries bind
+    them with ``pika = lazy_import('pika')`` and use them as usual.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        # Only called for attributes missing on the stand-in, i.e. the module's own
+        return getattr(self._load(), attr)
+
+    def _load(self):
+        """Import the module now, raising ImportError when it is not installed"""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __repr__(self):
+        state = 'imported' if self._module is not None else 'not imported yet'
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_import(name):
+    """Return ``name`` as a module that is only imported when first used"""
+    return LazyModule(name)
@@ -0,0 +1,65 @@
+import json
+import logging
+import os
+from robot.api import logger
+
+# Same mapping Robot Framework uses when it routes the root logger's level
+LEVELS = {
+    'TRACE': logging.NOTSET,
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARN': logging.WARNING,
+    'ERROR': logging.ERROR
+}
+
+MAX_PAYLOAD_CHARS = int(os.getenv('ROBOT_LIBRARY_LOG_MAX_CHARS', '2000'))
+
+# Quiet (perf) mode drops everything below WARN, e.g. for load runs
+_quiet = os.getenv('ROBOT_LIBRARY_QUIET', '').lower() in ('1', 'true', 'yes')
+
+def set_quiet(enabled=True):
+    """Switch quiet mode on or off for every library in the process"""
+    global _quiet
+    _quiet = bool(enabled)
+
+def is_enabled(level):
+    """Whether a message at ``level`` would reach the Robot log
+
+    During a run Robot sets the root logger's level from ``--loglevel`` and
+    'Set Log Level', so the check follows the active log level.
+    """
+    level_no = LEVELS[level]
+    if _quiet and level_no < logging.WARNING:
+        return False
+    return logging.getLogger().isEnabledFor(level_no)
+
+class Payload:
+    """Defers ``json.dumps`` of logged data until the message is actually formatted"""
+
+    __slots__ = ('data', 'indent')
+
+    def __init__(self, data, indent=2):
+        self.data = data
+        self.indent = indent
+
+    def __str__(self):
+        text = json.dumps(self.data, indent=self.indent, default=str)
+        if len(text) > MAX_PAYLOAD_CHARS:
+            return f"{text[:MAX_PAYLOAD_CHARS]}... [truncated {len(text) - MAX_PAYLOAD_CHARS} chars]"
+        return text
+
+def _log(method, level, message, args):
+    if is_enabled(level):
+        method(message % args if args else message)
+
+def debug(message, *args):
+    """Log ``message % args`` at DEBUG, formatting only when DEBUG is enabled"""
+    _log(logger.debug, 'DEBUG', message, args)
+
+def info(message, *args):
+    """Log ``message % args`` at INFO, formatting only when INFO is enabled"""
+    _log(logger.info, 'INFO', message, args)
+
+def warn(message, *args):
+    """Log ``message % args`` at WARN, formatting only when WARN is enabled"""
+    _log(logger.warn, 'WARN', message, args)
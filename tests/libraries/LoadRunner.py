@@ -0,0 +1,119 @@
+import json
+import math
+import os
+import time
+from robot.api.deco import keyword
+from robot.api import logger
+from robot.libraries.BuiltIn import BuiltIn
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+def percentile(sorted_values, quantile):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(quantile * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+def summarize(scenario, samples, errors, elapsed):
+    """Latency percentiles, throughput and error rate of ``(latency, passed)`` samples"""
+    latencies = sorted(latency for latency, passed in samples)
+    failed = sum(1 for latency, passed in samples if not passed)
+    summary = {
+        'scenario': scenario,
+        'iterations': len(samples),
+        'failed': failed,
+        'error_rate': round(failed / len(samples), 4) if samples else 0.0,
+        'duration': round(elapsed, 3),
+        'rps': round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0,
+        'errors': dict(sorted(errors.items(), key=lambda item: item[1], reverse=True)[:10])
+    }
+    for quantile in QUANTILES:
+        summary[f'p{int(quantile * 100)}'] = round(percentile(latencies, quantile), 6)
+    summary['max'] = round(latencies[-1], 6) if latencies else 0.0
+    return summary
+
+class LoadRunner:
+    """Run existing keywords repeatedly at a target rate and report latency percentiles"""
+    
+    def __init__(self):
+        self.last_summary = None
+    
+    @keyword('Run Load Test')
+    def run_load_test(self, keyword_name, *args, duration=60, rps=None, max_iterations=None, data_pools=None,
+                      pool_size=1000, scenario=None, samples_path=None):
+        """Run ``keyword_name`` with ``args`` over and over for ``duration`` seconds
+        
+        Iterations run one at a time, so pacing is closed loop: a slow
+        iteration delays the ones after it. With ``rps`` they are scheduled
+        on a fixed timetable and latency is measured from the scheduled
+        start, so the wait behind a slow iteration counts as latency instead
+        of being omitted (coordinated omission); sustaining a rate beyond
+        one iteration at a time takes more workers. Without ``rps``
+        iterations run back to back. Failing
+        iterations are counted as errors and do not stop the run.
+        ``data_pools`` (e.g. ``user,api``) creates TestDataGenerator pools
+        first, so generated data does not slow the iterations down.
+        Latencies are observed in MetricsCollector when the suite imports it
+        and the summary (p50/p95/p99, error rate, achieved rps) is returned
+        and written to ``samples_path`` as JSON together with the samples.
+        """
+        builtin = BuiltIn()
+        scenario = scenario or keyword_name
+        duration = float(duration)
+        interval = 1.0 / float(rps) if rps else 0.0
+        max_iterations = int(max_iterations) if max_iterations else None
+        metrics = self._metrics_collector()
+        
+        if isinstance(data_pools, str):
+            data_pools = [kind.strip() for kind in data_pools.split(',') if kind.strip()]
+        for kind in data_pools or []:
+            builtin.run_keyword('Create Test Data Pool', kind, pool_size)
+        
+        samples = []
+        errors = {}
+        start = time.monotonic()
+        deadline = start + duration
+        logger.info(f"Running '{keyword_name}' for {duration}s at {rps or 'max'} rps")
+        
+        while max_iterations is None or len(samples) < max_iterations:
+            scheduled = start + len(samples) * interval
+            if scheduled >= deadline:
+                break
+            if scheduled > time.monotonic():
+                time.sleep(scheduled - time.monotonic())
+            
+            # Behind schedule, the iteration's latency includes the time it should already have been running
+            iteration_start = min(scheduled, time.monotonic()) if interval else time.monotonic()
+            status, message = builtin.run_keyword_and_ignore_error(keyword_name, *args)
+            latency = time.monotonic() - iteration_start
+            passed = status == 'PASS'
+            samples.append((latency, passed))
+            if not passed:
+                errors[str(message)] = errors.get(str(message), 0) + 1
+            if metrics:
+                metrics.record_load_iteration(scenario, latency, passed)
+        
+        summary = self.last_summary = summarize(scenario, samples, errors, time.monotonic() - start)
+        if metrics:
+            metrics.record_load_test_summary(scenario, summary)
+        if samples_path:
+            self._write_samples(samples_path, summary, samples, errors)
+        
+        logger.info(f"Load test '{scenario}': {summary['iterations']} iterations at {summary['rps']} rps, "
+                    f"p50={summary['p50']}s p95={summary['p95']}s p99={summary['p99']}s, "
+                    f"error rate {summary['error_rate']}")
+        return summary
+    
+    @staticmethod
+    def _write_samples(path, summary, samples, errors):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'summary': summary, 'samples': samples, 'errors': errors}, f)
+    
+    @staticmethod
+    def _metrics_collector():
+        try:
+            return BuiltIn().get_library_instance('MetricsCollector')
+        except Exception:
+            return None
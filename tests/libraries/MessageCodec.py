@@ -0,0 +1,126 @@
+import gzip
+import json
+from LazyImport import lazy_import
+
+# Optional dependencies, only imported when a message uses them
+msgpack = lazy_import('msgpack')
+zstandard = lazy_import('zstandard')
+lz4_frame = lazy_import('lz4.frame')
+
+# Package to install for each optional format
+PACKAGES = {'msgpack': (msgpack, 'msgpack'), 'zstd': (zstandard, 'zstandard'), 'lz4': (lz4_frame, 'lz4')}
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'compact-json': 'application/json',
+    'msgpack': 'application/msgpack'
+}
+
+# Content type variants other producers use for the same formats
+DECODERS = {
+    'application/json': lambda body: json.loads(body.decode('utf-8')),
+    'application/msgpack': lambda body: msgpack.unpackb(body, raw=False),
+    'application/x-msgpack': lambda body: msgpack.unpackb(body, raw=False),
+    'application/vnd.msgpack': lambda body: msgpack.unpackb(body, raw=False)
+}
+
+DECOMPRESSORS = {
+    'gzip': gzip.decompress,
+    'zstd': lambda body: zstandard.ZstdDecompressor().decompress(body),
+    'lz4': lambda body: lz4_frame.decompress(body)
+}
+
+class MessageCodec:
+    """Serializes and optionally compresses published messages
+
+    ``serializer`` is ``json`` (the historic ``json.dumps`` output),
+    ``compact-json`` (no whitespace, UTF-8 instead of ``\\u`` escapes) or
+    ``msgpack``. ``compression`` is ``none``, ``gzip``, ``zstd`` or ``lz4``
+    and only applies to messages of at least ``min_compress_size`` bytes,
+    since small ones barely shrink. ``encode`` returns the body together with
+    the content type and encoding, which producers send as message headers so
+    consumers can decode any mix of formats.
+    """
+
+    def __init__(self, serializer='json', compression='none', compression_level=None, min_compress_size=1024):
+        if serializer not in CONTENT_TYPES:
+            raise ValueError(f"Unknown serializer '{serializer}', expected one of {sorted(CONTENT_TYPES)}")
+        compression = str(compression or 'none').lower()
+        if compression != 'none' and compression not in DECOMPRESSORS:
+            raise ValueError(f"Unknown compression '{compression}', expected none or one of {sorted(DECOMPRESSORS)}")
+        self.serializer = serializer
+        self.compression = compression
+        self.compression_level = None if compression_level in (None, '', 'None') else int(compression_level)
+        self.min_compress_size = int(min_compress_size)
+        self.content_type = CONTENT_TYPES[serializer]
+        for name in (serializer, compression):
+            _require(name)
+        self._serialize = getattr(self, f"_serialize_{serializer.replace('-', '_')}")
+        self._compress = None if compression == 'none' else self._compressor(compression)
+
+    def encode(self, value):
+        """Return ``(body, content_type, content_encoding)``; the encoding is None when not compressed"""
+        body = self._serialize(value)
+        if self._compress and len(body) >= self.min_compress_size:
+            return self._compress(body), self.content_type, self.compression
+        return body, self.content_type, None
+
+    @staticmethod
+    def _serialize_json(value):
+        return json.dumps(value).encode('utf-8')
+
+    @staticmethod
+    def _serialize_compact_json(value):
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    @staticmethod
+    def _serialize_msgpack(value):
+        return msgpack.packb(value, use_bin_type=True, default=str)
+
+    def _compressor(self, compression):
+        level = self.compression_level
+        if compression == 'gzip':
+            return lambda body: gzip.compress(body, compresslevel=9 if level is None else level)
+        if compression == 'zstd':
+            compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+            return compressor.compress
+        return lambda body: lz4_frame.compress(body, compression_level=0 if level is None else level)
+
+def _require(name):
+    """Fail when a format is selected, not at the first message, if its package is missing"""
+    if name not in PACKAGES:
+        return
+    module, package = PACKAGES[name]
+    try:
+        module._load()
+    except ImportError:
+        raise RuntimeError(f"'{name}' needs the {package} package: pip install {package}")
+
+def decode(body, content_type=None, content_encoding=None):
+    """Decode a message body using its content type and encoding headers
+
+    Messages without headers are JSON, as everything published before the
+    headers existed. Bodies that are already ``str`` are treated as JSON text.
+    """
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    if content_encoding and content_encoding != 'identity':
+        if content_encoding not in DECOMPRESSORS:
+            raise ValueError(f"Unsupported content encoding '{content_encoding}'")
+        body = DECOMPRESSORS[content_encoding](body)
+    content_type = (content_type or 'application/json').split(';')[0].strip().lower()
+    if content_type not in DECODERS:
+        raise ValueError(f"Unsupported content type '{content_type}'")
+    return DECODERS[content_type](body)
+
+def kafka_headers(content_type, content_encoding):
+    """Kafka record headers describing an encoded value"""
+    headers = [('content-type', content_type.encode('ascii'))]
+    if content_encoding:
+        headers.append(('content-encoding', content_encoding.encode('ascii')))
+    return headers
+
+def decode_kafka_value(value, headers):
+    """Decode a consumed Kafka record value using its ``(key, bytes)`` headers"""
+    headers = {key: header_value.decode('ascii') for key, header_value in headers or []}
+    return decode(value, headers.get('content-type'), headers.get('content-encoding'))
@@ -1,38 +1,348 @@
+import atexit
+import glob
+import json
+import os
+import threading
 import time
-from prometheus_client import Counter, Histogram, Gauge, push_to_gateway, CollectorRegistry
+from prometheus_client import Counter, Histogram, Gauge, push_to_gateway, CollectorRegistry, generate_latest
 from robot.api.deco import keyword
 from robot.api import logger
+from RetryDecorator import RetryPolicy
+from ConfigManager import ConfigManager
+
+DEFAULT_OVERFLOW_VALUE = '__other__'
+
+class LabelLimiter:
+    """Bounds the number of distinct values each label of one metric can take
+    
+    Labels with an allow-list keep only the listed values. Other labels
+    admit values first come, first served up to their limit: the first
+    distinct values recorded keep their own series, however rarely they
+    occur later, and everything after is reported under the overflow value.
+    """
+    
+    def __init__(self, limits=None, allow_lists=None, default_limit=None, overflow_value=DEFAULT_OVERFLOW_VALUE):
+        self.limits = {label: int(limit) for label, limit in (limits or {}).items()}
+        self.allow_lists = {label: {str(value) for value in values} for label, values in (allow_lists or {}).items()}
+        self.default_limit = None if default_limit is None else int(default_limit)
+        self.overflow_value = overflow_value
+        self.seen = {}
+        self._lock = threading.Lock()
+    
+    def apply(self, labels):
+        """Return the label values to record and the names of the labels that overflowed"""
+        limited = {}
+        overflowed = []
+        with self._lock:
+            for label, value in labels.items():
+                value = str(value)
+                allowed = self.allow_lists.get(label)
+                limit = self.limits.get(label, self.default_limit)
+                if allowed is not None:
+                    admitted = value in allowed
+                elif limit is not None:
+                    seen = self.seen.setdefault(label, set())
+                    admitted = value in seen or len(seen) < limit
+                    if admitted:
+                        seen.add(value)
+                else:
+                    admitted = True
+                
+                if not admitted:
+                    value = self.overflow_value
+                    overflowed.append(label)
+                limited[label] = value
+        return limited, overflowed
+
+class LimitedMetric:
+    """Wraps a metric so every ``labels()`` call goes through its LabelLimiter"""
+    
+    def __init__(self, name, metric, limiter, on_overflow=None):
+        self.name = name
+        self.metric = metric
+        self.limiter = limiter
+        self.on_overflow = on_overflow
+    
+    def labels(self, **labels):
+        limited, overflowed = self.limiter.apply(labels)
+        if self.on_overflow:
+            for label in overflowed:
+                self.on_overflow(self.name, label)
+        return self.metric.labels(**limited)
+    
+    def __getattr__(self, name):
+        return getattr(self.metric, name)
+
+class _SpooledRegistry:
+    """Registry stand-in that replays a spooled text exposition"""
+    
+    def __init__(self, text):
+        self.text = text
+    
+    def collect(self):
+        # Only needed when replaying a spool, so not imported with the library
+        from prometheus_client.parser import text_string_to_metric_families
+        return text_string_to_metric_families(self.text)
+
+class MetricsAggregator:
+    """Pushes a registry to the Pushgateway from a background thread
+    
+    The registry itself aggregates the updates, so the thread only pushes a
+    snapshot every ``interval`` seconds when a push was requested, retrying
+    with jittered backoff. While the gateway is unreachable the latest
+    snapshot is spooled to ``spool_dir`` and replayed by the next successful
+    push, also from a later run, unless something newer was pushed under
+    the same grouping key since. Each push waits at most ``push_timeout``
+    seconds for the gateway.
+    """
+    
+    def __init__(self, registry, gateway_url, job_name, grouping_key=None, interval=15.0,
+                 spool_dir='history/metrics_spool', policy=None, push_timeout=5.0):
+        self.registry = registry
+        self.gateway_url = gateway_url
+        self.job_name = job_name
+        self.grouping_key = grouping_key
+        self.interval = float(interval)
+        self.spool_dir = spool_dir
+        self.policy = policy or RetryPolicy(max_attempts=3, delay=1.0, backoff=2.0, max_delay=30.0, jitter='full')
+        self.push_timeout = float(push_timeout)
+        self.pending = True
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-aggregator', daemon=True)
+    
+    @staticmethod
+    def _spool_name(job_name, grouping_key):
+        worker = '-'.join(str(value) for value in (grouping_key or {}).values()) or 'default'
+        return f"{job_name}-{worker}"
+    
+    @property
+    def spool_path(self):
+        return os.path.join(self.spool_dir, self._spool_name(self.job_name, self.grouping_key) + '.json')
+    
+    def _pushed_marker(self, job_name, grouping_key):
+        """File whose modification time is the last successful push for a grouping key"""
+        return os.path.join(self.spool_dir, self._spool_name(job_name, grouping_key) + '.pushed')
+    
+    def start(self):
+        self._thread.start()
+    
+    def request_push(self, immediately=False):
+        self.pending = True
+        if immediately:
+            self._wake.set()
+    
+    def stop(self, timeout=10.0):
+        """Stop the thread after a final flush, waiting at most ``timeout`` seconds
+        
+        The final push gets half of ``timeout``; when the thread is still
+        busy after ``timeout``, the snapshot is spooled from here instead.
+        """
+        timeout = float(timeout)
+        self.push_timeout = max(min(self.push_timeout, timeout / 2), 0.1)
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warn(f"Final metrics push to {self.gateway_url} did not finish in {timeout}s, spooling it")
+            self._spool()
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self.pending and not self._stopping.is_set():
+                self._push_with_retry(self.policy.max_attempts)
+        # Final flush: a single attempt, spooling on failure, so exit is never held up by retries
+        self._push_with_retry(1)
+    
+    def _push_with_retry(self, max_attempts):
+        self.pending = False
+        sleep = 0.0
+        for attempt in range(1, max_attempts + 1):
+            try:
+                push_to_gateway(self.gateway_url, job=self.job_name, registry=self.registry,
+                                grouping_key=self.grouping_key, timeout=self.push_timeout)
+                self._mark_pushed(self.job_name, self.grouping_key)
+                self._replay_spool()
+                return True
+            except Exception as e:
+                logger.warn(f"Metrics push to {self.gateway_url} failed (attempt {attempt}/{max_attempts}): {str(e)}")
+                if attempt < max_attempts:
+                    sleep = self.policy.next_delay(attempt, sleep)
+                    if self._stopping.wait(sleep):
+                        break
+        
+        self._spool()
+        self.pending = True
+        return False
+    
+    def _mark_pushed(self, job_name, grouping_key):
+        try:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            with open(self._pushed_marker(job_name, grouping_key), 'a'):
+                pass
+            os.utime(self._pushed_marker(job_name, grouping_key))
+        except OSError as e:
+            logger.warn(f"Failed to record metrics push time: {str(e)}")
+    
+    def _spool(self):
+        try:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            entry = {
+                'gateway_url': self.gateway_url,
+                'job': self.job_name,
+                'grouping_key': self.grouping_key,
+                'metrics': generate_latest(self.registry).decode('utf-8'),
+                'spooled_at': time.time()
+            }
+            # Write then rename, so a crash never leaves a half-written spool; the temporary
+            # name is per thread because stop() may spool while the final push still runs
+            temp_path = f"{self.spool_path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(temp_path, self.spool_path)
+            logger.info(f"Spooled metrics to {self.spool_path} until the gateway is reachable")
+        except Exception as e:
+            logger.error(f"Failed to spool metrics: {str(e)}")
+    
+    def _replay_spool(self):
+        """Push snapshots spooled by earlier failures, then drop them
+        
+        A snapshot spooled before the last successful push of its grouping key
+        is dropped without pushing, as it would overwrite newer metrics.
+        """
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, '*.json'))):
+            try:
+                if path == self.spool_path:
+                    # Superseded by the snapshot just pushed from the live registry
+                    os.remove(path)
+                    continue
+                with open(path) as f:
+                    entry = json.load(f)
+                marker = self._pushed_marker(entry['job'], entry['grouping_key'])
+                if os.path.exists(marker) and os.path.getmtime(marker) >= entry['spooled_at']:
+                    os.remove(path)
+                    logger.info(f"Dropped spooled metrics from {path}, newer metrics were pushed since")
+                    continue
+                push_to_gateway(entry['gateway_url'], job=entry['job'], registry=_SpooledRegistry(entry['metrics']),
+                                grouping_key=entry['grouping_key'], timeout=self.push_timeout)
+                self._mark_pushed(entry['job'], entry['grouping_key'])
+                os.remove(path)
+                logger.info(f"Replayed spooled metrics from {path}")
+            except Exception as e:
+                logger.warn(f"Failed to replay spooled metrics from {path}: {str(e)}")
 
 class MetricsCollector:
     """Prometheus metrics collector for Robot Framework"""
     
-    def __init__(self):
+    # One registry per process, so a parallel worker accumulates all of its tests
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+    
+    def __init__(self, config_path='config/config.yaml'):
         self.registry = CollectorRegistry()
         self.metrics = {}
+        self.metrics_config = self._load_metrics_config(config_path)
+        self.history_path = os.getenv('ROBOT_DURATION_HISTORY', 'history/test_durations.jsonl')
+        self.aggregator = None
         self._init_default_metrics()
         
     def _init_default_metrics(self):
         """Initialize default metrics"""
-        self.metrics['test_total'] = Counter(
+        self.metrics['label_overflows'] = Counter(
+            'robot_metric_label_overflows_total',
+            'Total number of label values reported under the overflow value',
+            ['metric', 'label'],
+            registry=self.registry
+        )
+        
+        self.metrics['test_total'] = self._limited('robot_tests_total', Counter(
             'robot_tests_total', 
             'Total number of tests executed',
             ['test_name', 'suite', 'status'],
             registry=self.registry
-        )
+        ))
         
-        self.metrics['test_duration'] = Histogram(
+        self.metrics['test_duration'] = self._limited('robot_test_duration_seconds', Histogram(
             'robot_test_duration_seconds',
             'Test execution duration in seconds',
             ['test_name', 'suite'],
+            buckets=self._buckets('robot_test_duration_seconds'),
             registry=self.registry
-        )
+        ))
         
-        self.metrics['test_retries'] = Counter(
+        self.metrics['test_retries'] = self._limited('robot_test_retries_total', Counter(
             'robot_test_retries_total',
             'Total number of test retries',
             ['test_name', 'suite'],
             registry=self.registry
-        )
+        ))
+        
+        self.metrics['circuit_breaker_trips'] = self._limited('robot_circuit_breaker_trips_total', Counter(
+            'robot_circuit_breaker_trips_total',
+            'Total number of circuit breaker trips per endpoint',
+            ['endpoint', 'suite'],
+            registry=self.registry
+        ))
+        
+        self.metrics['response_cache_lookups'] = self._limited('robot_response_cache_lookups_total', Counter(
+            'robot_response_cache_lookups_total',
+            'Total number of response cache lookups by result (hit or miss)',
+            ['result', 'endpoint'],
+            registry=self.registry
+        ))
+        
+        self.metrics['keyword_duration'] = self._limited('robot_keyword_duration_seconds', Histogram(
+            'robot_keyword_duration_seconds',
+            'Keyword and HTTP call duration in seconds, recorded by the KeywordProfiler listener',
+            ['keyword', 'library'],
+            buckets=self._buckets('robot_keyword_duration_seconds'),
+            registry=self.registry
+        ))
+        
+        self.metrics['http_phase_duration'] = self._limited('robot_http_phase_duration_seconds', Histogram(
+            'robot_http_phase_duration_seconds',
+            'HTTP request phase (dns, connect, tls, ttfb, download) duration in seconds',
+            ['endpoint', 'phase'],
+            buckets=self._buckets('robot_http_phase_duration_seconds'),
+            registry=self.registry
+        ))
+        
+        self.metrics['http_requests'] = self._limited('robot_http_requests_total', Counter(
+            'robot_http_requests_total',
+            'Total number of timed HTTP requests by connection (new or reused)',
+            ['endpoint', 'connection'],
+            registry=self.registry
+        ))
+        
+        self.metrics['load_latency'] = self._limited('robot_load_latency_seconds', Histogram(
+            'robot_load_latency_seconds',
+            'Latency of load test iterations in seconds',
+            ['scenario'],
+            buckets=self._buckets('robot_load_latency_seconds'),
+            registry=self.registry
+        ))
+        
+        self.metrics['load_iterations'] = self._limited('robot_load_iterations_total', Counter(
+            'robot_load_iterations_total',
+            'Total number of load test iterations by status',
+            ['scenario', 'status'],
+            registry=self.registry
+        ))
+        
+        self.metrics['load_latency_quantiles'] = self._limited('robot_load_latency_quantile_seconds', Gauge(
+            'robot_load_latency_quantile_seconds',
+            'Latency percentiles (p50, p95, p99) of the last load test per scenario',
+            ['scenario', 'quantile'],
+            registry=self.registry
+        ))
+        
+        self.metrics['load_error_ratio'] = self._limited('robot_load_error_ratio', Gauge(
+            'robot_load_error_ratio',
+            'Share of failed iterations in the last load test per scenario',
+            ['scenario'],
+            registry=self.registry
+        ))
         
         self.metrics['active_tests'] = Gauge(
             'robot_active_tests',
@@ -40,6 +350,43 @@ class MetricsCollector:
             registry=self.registry
         )
     
+    @staticmethod
+    def _load_metrics_config(config_path):
+        """Read the ``monitoring.metrics`` section (label limits, allow-lists, buckets)"""
+        if not config_path or not os.path.exists(config_path):
+            return {}
+        config = ConfigManager()
+        config.load_configuration(config_path, env_path='')
+        return config.get_config_value('monitoring.metrics', {}) or {}
+    
+    def _metric_settings(self, name):
+        return (self.metrics_config.get('per_metric') or {}).get(name) or {}
+    
+    def _buckets(self, name, buckets=None):
+        """Histogram buckets: explicit, then per metric, then ``default_buckets`` from the config"""
+        buckets = buckets or self._metric_settings(name).get('buckets') or self.metrics_config.get('default_buckets')
+        if not buckets:
+            return Histogram.DEFAULT_BUCKETS
+        if isinstance(buckets, str):
+            buckets = buckets.split(',')
+        return [float(bucket) for bucket in buckets]
+    
+    def _limited(self, name, metric, max_label_values=None):
+        """Apply the configured label limits and allow-lists of ``name`` to ``metric``"""
+        settings = self._metric_settings(name)
+        if max_label_values is None:
+            max_label_values = self.metrics_config.get('default_label_limit')
+        limiter = LabelLimiter(
+            limits=settings.get('label_limits'),
+            allow_lists=settings.get('allow_lists'),
+            default_limit=max_label_values,
+            overflow_value=self.metrics_config.get('overflow_value', DEFAULT_OVERFLOW_VALUE)
+        )
+        return LimitedMetric(name, metric, limiter, self._record_label_overflow)
+    
+    def _record_label_overflow(self, name, label):
+        self.metrics['label_overflows'].labels(metric=name, label=label).inc()
+    
     @keyword('Record Test Execution')
     def record_test_execution(self, test_name, suite_name, status, duration):
         """Record test execution metrics"""
@@ -57,11 +404,30 @@ class MetricsCollector:
                 suite=suite_name
             ).observe(float(duration))
             
+            self._append_duration_history(test_name, suite_name, status, duration)
+            
             logger.info(f"Recorded metrics for test '{test_name}': status={status}, duration={duration}s")
             
         except Exception as e:
             logger.error(f"Failed to record test metrics: {str(e)}")
     
+    def _append_duration_history(self, test_name, suite_name, status, duration):
+        """Append the duration to the local history used by the test scheduler"""
+        if not self.history_path:
+            return
+        
+        entry = {
+            'test': test_name,
+            'suite': suite_name,
+            'status': status.lower(),
+            'duration': float(duration),
+            'recorded_at': time.time()
+        }
+        os.makedirs(os.path.dirname(self.history_path) or '.', exist_ok=True)
+        # One short line per append, so concurrent workers do not interleave
+        with open(self.history_path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+    
     @keyword('Record Test Retry')
     def record_test_retry(self, test_name, suite_name):
         """Record test retry metrics"""
@@ -76,6 +442,93 @@ class MetricsCollector:
         except Exception as e:
             logger.error(f"Failed to record retry metrics: {str(e)}")
     
+    @keyword('Record Circuit Breaker Trip')
+    def record_circuit_breaker_trip(self, endpoint, suite_name):
+        """Record a circuit breaker opening for an endpoint"""
+        try:
+            self.metrics['circuit_breaker_trips'].labels(
+                endpoint=endpoint,
+                suite=suite_name
+            ).inc()
+            
+            logger.info(f"Recorded circuit breaker trip for '{endpoint}' in suite '{suite_name}'")
+            
+        except Exception as e:
+            logger.error(f"Failed to record circuit breaker metrics: {str(e)}")
+    
+    @keyword('Record Response Cache Lookup')
+    def record_response_cache_lookup(self, result, endpoint):
+        """Record a response cache hit or miss for an endpoint"""
+        try:
+            self.metrics['response_cache_lookups'].labels(
+                result=result,
+                endpoint=endpoint
+            ).inc()
+            
+        except Exception as e:
+            logger.error(f"Failed to record response cache metrics: {str(e)}")
+    
+    @keyword('Record Keyword Duration')
+    def record_keyword_duration(self, keyword_name, library, duration):
+        """Record the duration of one keyword or HTTP call
+
+        Called by the KeywordProfiler listener for every call, so it does not log.
+        """
+        try:
+            self.metrics['keyword_duration'].labels(
+                keyword=keyword_name,
+                library=library or 'user'
+            ).observe(float(duration))
+            
+        except Exception as e:
+            logger.error(f"Failed to record keyword duration: {str(e)}")
+    
+    @keyword('Record HTTP Timing')
+    def record_http_timing(self, endpoint, timings):
+        """Record the phase durations and connection reuse of one HTTP request"""
+        try:
+            for phase in ('dns', 'connect', 'tls', 'ttfb', 'download'):
+                self.metrics['http_phase_duration'].labels(
+                    endpoint=endpoint,
+                    phase=phase
+                ).observe(float(timings.get(phase, 0.0)))
+            
+            self.metrics['http_requests'].labels(
+                endpoint=endpoint,
+                connection='reused' if timings.get('reused') else 'new'
+            ).inc()
+            
+        except Exception as e:
+            logger.error(f"Failed to record HTTP timing: {str(e)}")
+    
+    @keyword('Record Load Iteration')
+    def record_load_iteration(self, scenario, latency, passed):
+        """Record one load test iteration; called for every iteration, so it does not log"""
+        try:
+            self.metrics['load_latency'].labels(scenario=scenario).observe(float(latency))
+            self.metrics['load_iterations'].labels(scenario=scenario, status='pass' if passed else 'fail').inc()
+            
+        except Exception as e:
+            logger.error(f"Failed to record load iteration: {str(e)}")
+    
+    @keyword('Record Load Test Summary')
+    def record_load_test_summary(self, scenario, summary):
+        """Record the latency percentiles and error rate of a finished load test"""
+        try:
+            for quantile in ('p50', 'p95', 'p99'):
+                self.metrics['load_latency_quantiles'].labels(
+                    scenario=scenario,
+                    quantile=quantile
+                ).set(float(summary[quantile]))
+            
+            self.metrics['load_error_ratio'].labels(scenario=scenario).set(float(summary['error_rate']))
+            
+            logger.info(f"Recorded load test summary for '{scenario}': p95={summary['p95']}s, "
+                        f"error rate {summary['error_rate']}")
+            
+        except Exception as e:
+            logger.error(f"Failed to record load test summary: {str(e)}")
+    
     @keyword('Set Active Tests Count')
     def set_active_tests_count(self, count):
         """Set the number of active tests"""
@@ -86,34 +539,133 @@ class MetricsCollector:
         except Exception as e:
             logger.error(f"Failed to set active tests count: {str(e)}")
     
+    @keyword('Start Metrics Aggregator')
+    def start_metrics_aggregator(self, gateway_url='http://localhost:9091', job_name='robot-tests', interval=15,
+                                 spool_dir=None):
+        """Push metrics from a background thread instead of blocking 'Push Metrics To Prometheus'
+        
+        Pushes happen at most every ``interval`` seconds, are retried with
+        backoff and are spooled to ``spool_dir`` (``ROBOT_METRICS_SPOOL``,
+        default ``history/metrics_spool``) while the gateway is unreachable.
+        A final push is made on 'Stop Metrics Aggregator' or process exit.
+        Starting it again while it runs has no effect.
+        """
+        if self.aggregator:
+            return
+        
+        try:
+            self.aggregator = MetricsAggregator(
+                self.registry,
+                gateway_url,
+                job_name,
+                grouping_key=self._grouping_key(),
+                interval=float(interval),
+                spool_dir=spool_dir or os.getenv('ROBOT_METRICS_SPOOL', 'history/metrics_spool')
+            )
+            self.aggregator.start()
+            atexit.register(self.stop_metrics_aggregator)
+            logger.info(f"Started metrics aggregator for {gateway_url} (interval={interval}s)")
+            
+        except Exception as e:
+            logger.error(f"Failed to start metrics aggregator: {str(e)}")
+            raise
+    
+    @keyword('Stop Metrics Aggregator')
+    def stop_metrics_aggregator(self, timeout=10):
+        """Flush the metrics one last time and stop the background thread"""
+        aggregator, self.aggregator = self.aggregator, None
+        if aggregator:
+            aggregator.stop(float(timeout))
+            logger.info("Stopped metrics aggregator")
+    
     @keyword('Push Metrics To Prometheus')
     def push_metrics_to_prometheus(self, gateway_url='http://localhost:9091', job_name='robot-tests'):
-        """Push metrics to Prometheus pushgateway"""
+        """Push metrics to Prometheus pushgateway
+
+        Parallel workers set ``ROBOT_WORKER_ID`` and push under their own
+        grouping key so they do not replace each other's metrics. While the
+        metrics aggregator runs for the same gateway and job, the push is
+        only queued for its next interval and this keyword returns at once.
+        """
+        aggregator = self.aggregator
+        if aggregator and (aggregator.gateway_url, aggregator.job_name) == (gateway_url, job_name):
+            aggregator.request_push()
+            logger.info(f"Queued metrics push to {gateway_url} for the metrics aggregator")
+            return
+        
         try:
-            push_to_gateway(gateway_url, job=job_name, registry=self.registry)
+            push_to_gateway(gateway_url, job=job_name, registry=self.registry, grouping_key=self._grouping_key())
             logger.info(f"Pushed metrics to Prometheus gateway at {gateway_url}")
             
         except Exception as e:
             logger.error(f"Failed to push metrics to Prometheus: {str(e)}")
             raise
     
+    @staticmethod
+    def _grouping_key():
+        worker_id = os.getenv('ROBOT_WORKER_ID')
+        return {'worker': worker_id} if worker_id else None
+    
     @keyword('Create Custom Counter')
-    def create_custom_counter(self, name, description, labels=None):
-        """Create a custom counter metric"""
+    def create_custom_counter(self, name, description, labels=None, max_label_values=None):
+        """Create a custom counter metric
+
+        ``max_label_values`` caps the distinct values of each label, on top of
+        the limits configured for ``name`` under ``monitoring.metrics``.
+        """
         try:
             labels = labels or []
-            self.metrics[name] = Counter(
+            self.metrics[name] = self._limited(name, Counter(
                 name,
                 description,
                 labels,
                 registry=self.registry
-            )
+            ), max_label_values)
             logger.info(f"Created custom counter '{name}'")
             
         except Exception as e:
             logger.error(f"Failed to create custom counter: {str(e)}")
             raise
     
+    @keyword('Create Custom Gauge')
+    def create_custom_gauge(self, name, description, labels=None, max_label_values=None):
+        """Create a custom gauge metric with the same label limits as custom counters"""
+        try:
+            labels = labels or []
+            self.metrics[name] = self._limited(name, Gauge(
+                name,
+                description,
+                labels,
+                registry=self.registry
+            ), max_label_values)
+            logger.info(f"Created custom gauge '{name}'")
+            
+        except Exception as e:
+            logger.error(f"Failed to create custom gauge: {str(e)}")
+            raise
+    
+    @keyword('Create Custom Histogram')
+    def create_custom_histogram(self, name, description, labels=None, buckets=None, max_label_values=None):
+        """Create a custom histogram metric with the same label limits as custom counters
+
+        Without ``buckets`` the buckets configured for ``name`` or the
+        ``default_buckets`` under ``monitoring.metrics`` are used.
+        """
+        try:
+            labels = labels or []
+            self.metrics[name] = self._limited(name, Histogram(
+                name,
+                description,
+                labels,
+                buckets=self._buckets(name, buckets),
+                registry=self.registry
+            ), max_label_values)
+            logger.info(f"Created custom histogram '{name}'")
+            
+        except Exception as e:
+            logger.error(f"Failed to create custom histogram: {str(e)}")
+            raise
+    
     @keyword('Increment Custom Counter')
     def increment_custom_counter(self, name, label_values=None):
         """Increment a custom counter"""
@@ -131,3 +683,39 @@ class MetricsCollector:
         except Exception as e:
             logger.error(f"Failed to increment counter: {str(e)}")
             raise
+    
+    @keyword('Set Custom Gauge')
+    def set_custom_gauge(self, name, value, label_values=None):
+        """Set a custom gauge"""
+        try:
+            if name not in self.metrics:
+                raise ValueError(f"Gauge '{name}' not found")
+            
+            if label_values:
+                self.metrics[name].labels(**label_values).set(float(value))
+            else:
+                self.metrics[name].set(float(value))
+                
+            logger.info(f"Set gauge '{name}' to {value} with labels {label_values}")
+            
+        except Exception as e:
+            logger.error(f"Failed to set gauge: {str(e)}")
+            raise
+    
+    @keyword('Observe Custom Histogram')
+    def observe_custom_histogram(self, name, value, label_values=None):
+        """Record an observation in a custom histogram"""
+        try:
+            if name not in self.metrics:
+                raise ValueError(f"Histogram '{name}' not found")
+            
+            if label_values:
+                self.metrics[name].labels(**label_values).observe(float(value))
+            else:
+                self.metrics[name].observe(float(value))
+                
+            logger.info(f"Observed {value} in histogram '{name}' with labels {label_values}")
+            
+        except Exception as e:
+            logger.error(f"Failed to observe histogram: {str(e)}")
+            raise
@@ -1,7 +1,41 @@
-import json
-import pika
+from datetime import datetime
+import time
 from robot.api.deco import keyword
 from robot.api import logger
+from ConnectionPool import credentials_digest, shared_pool, ThreadSafeProxy
+from LazyImport import lazy_import
+from MessageCodec import MessageCodec, decode
+
+# Imported on the first 'Connect To RabbitMQ'
+pika = lazy_import('pika')
+
+def _result_outbox():
+    try:
+        from robot.libraries.BuiltIn import BuiltIn
+        return BuiltIn().get_library_instance('ResultOutbox')
+    except Exception:
+        raise RuntimeError("ResultOutbox is not imported. Import it and use 'Start Result Outbox' first.")
+
+# Pika releases whose BlockingChannel wraps an asynchronous Channel as ``_impl``
+# with ``confirm_delivery(ack_nack_callback, callback)``
+ASYNC_CHANNEL_PIKA_VERSIONS = ((1, 0), (2, 0))
+
+def _async_channel(channel):
+    """The asynchronous channel behind a BlockingChannel, or None when not known to be usable
+
+    BlockingChannel only offers confirms that wait for every single ack, so
+    pipelining needs the private channel; it is only used on pika versions
+    where its interface is known.
+    """
+    impl = getattr(channel, '_impl', None)
+    try:
+        version = tuple(int(part) for part in pika.__version__.split('.')[:2])
+    except (AttributeError, ValueError):
+        return None
+    low, high = ASYNC_CHANNEL_PIKA_VERSIONS
+    if impl is None or not low <= version < high:
+        return None
+    return impl
 
 class RabbitMQProducerLibrary:
     """RabbitMQ producer library for Robot Framework messaging integration"""
@@ -9,11 +43,26 @@ class RabbitMQProducerLibrary:
     def __init__(self):
         self.connection = None
         self.channel = None
+        self.pool_key = None
+        self.pooled_client = None
+        self.codec = MessageCodec()
         
     @keyword('Connect To RabbitMQ')
-    def connect_to_rabbitmq(self, host='localhost', port=5672, username='guest', password='guest', virtual_host='/'):
-        """Connect to RabbitMQ broker"""
+    def connect_to_rabbitmq(self, host='localhost', port=5672, username='guest', password='guest', virtual_host='/',
+                            pooled=False, serializer='json', compression='none', compression_level=None,
+                            min_compress_size=1024):
+        """Connect to RabbitMQ broker
+
+        With ``pooled`` the connection and its channel are borrowed from the
+        process-wide connection pool. Calls on them are serialized through a
+        per-connection lock, as pika connections are not thread safe.
+
+        Dict and list messages are encoded with ``serializer`` and
+        ``compression`` (see ``MessageCodec``) and published with matching
+        ``content_type`` and ``content_encoding`` properties.
+        """
         try:
+            self.codec = MessageCodec(serializer, compression, compression_level, min_compress_size)
             credentials = pika.PlainCredentials(username, password)
             parameters = pika.ConnectionParameters(
                 host=host,
@@ -22,8 +71,19 @@ class RabbitMQProducerLibrary:
                 credentials=credentials
             )
             
-            self.connection = pika.BlockingConnection(parameters)
-            self.channel = self.connection.channel()
+            if pooled:
+                self.pool_key = ('rabbitmq', host, int(port), virtual_host, credentials_digest(username, password))
+                self.pooled_client, lock = shared_pool.borrow(
+                    self.pool_key,
+                    lambda: self._open_channel(parameters),
+                    health_check=lambda client: client[0].is_open and client[1].is_open,
+                    closer=lambda client: client[0].is_open and client[0].close()
+                )
+                connection, channel = self.pooled_client
+                self.connection = ThreadSafeProxy(connection, lock)
+                self.channel = ThreadSafeProxy(channel, lock)
+            else:
+                self.connection, self.channel = self._open_channel(parameters)
             
             logger.info(f"Connected to RabbitMQ at {host}:{port}")
             
@@ -31,6 +91,11 @@ class RabbitMQProducerLibrary:
             logger.error(f"Failed to connect to RabbitMQ: {str(e)}")
             raise
     
+    @staticmethod
+    def _open_channel(parameters):
+        connection = pika.BlockingConnection(parameters)
+        return connection, connection.channel()
+    
     @keyword('Declare Queue')
     def declare_queue(self, queue_name, durable=True):
         """Declare a queue in RabbitMQ"""
@@ -54,16 +119,13 @@ class RabbitMQProducerLibrary:
         
         try:
             routing_key = routing_key or queue_name
-            
-            # Ensure message is JSON string
-            if isinstance(message, dict):
-                message = json.dumps(message)
+            body, properties = self._encode(message)
             
             self.channel.basic_publish(
                 exchange=exchange,
                 routing_key=routing_key,
-                body=message,
-                properties=pika.BasicProperties(delivery_mode=2)  # Make message persistent
+                body=body,
+                properties=properties
             )
             
             logger.info(f"Message published to queue '{queue_name}'")
@@ -72,55 +134,267 @@ class RabbitMQProducerLibrary:
             logger.error(f"Failed to publish message to RabbitMQ: {str(e)}")
             raise
     
+    @keyword('Bulk Publish Messages To RabbitMQ')
+    def bulk_publish_messages_to_rabbitmq(self, queue_name, messages, exchange='', routing_key=None,
+                                          window=100, timeout=30):
+        """Publish messages to RabbitMQ queue with pipelined publisher confirms
+
+        Messages go out on a dedicated channel in confirm mode. Up to
+        ``window`` deliveries are kept unconfirmed before waiting for acks, so
+        persistence is guaranteed without a round trip per message. Pika
+        versions without the asynchronous channel this relies on (see
+        ``_async_channel``) confirm every message before sending the next.
+        Returns throughput and the indexes of nacked or unconfirmed messages.
+        """
+        if not self.connection:
+            raise RuntimeError("Not connected to RabbitMQ. Use 'Connect To RabbitMQ' first.")
+        
+        routing_key = routing_key or queue_name
+        deadline = time.monotonic() + float(timeout)
+        channel = self.connection.channel()
+        try:
+            start_time = time.monotonic()
+            impl = _async_channel(channel)
+            if impl is not None:
+                total, nacked, unconfirmed = self._publish_pipelined(impl, messages, exchange, routing_key,
+                                                                     max(int(window), 1), deadline)
+            else:
+                total, nacked, unconfirmed = self._publish_confirmed(channel, messages, exchange, routing_key,
+                                                                     deadline)
+            duration = time.monotonic() - start_time
+            
+        except Exception as e:
+            logger.error(f"Failed to bulk publish messages to RabbitMQ: {str(e)}")
+            raise
+        finally:
+            if channel.is_open:
+                channel.close()
+        
+        report = {
+            'total': total,
+            'confirmed': total - len(nacked) - len(unconfirmed),
+            'nacked': sorted(nacked),
+            'unconfirmed': unconfirmed,
+            'duration': round(duration, 6),
+            'messages_per_second': round(total / duration, 2) if duration > 0 else float(total)
+        }
+        
+        if nacked or unconfirmed:
+            logger.warn(f"{len(nacked)} nacked and {len(unconfirmed)} unconfirmed messages for queue '{queue_name}'")
+        logger.info(f"Bulk published {total} messages to queue '{queue_name}' "
+                    f"at {report['messages_per_second']} msg/s")
+        return report
+    
+    def _publish_pipelined(self, impl, messages, exchange, routing_key, window, deadline):
+        """Publish on the asynchronous channel with up to ``window`` unconfirmed deliveries"""
+        outstanding = {}
+        nacked = []
+        selected = []
+        
+        def on_confirm(frame):
+            method = frame.method
+            if method.multiple:
+                tags = [tag for tag in outstanding if tag <= method.delivery_tag]
+            else:
+                tags = [method.delivery_tag]
+            for tag in tags:
+                index = outstanding.pop(tag, None)
+                if index is not None and isinstance(method, pika.spec.Basic.Nack):
+                    nacked.append(index)
+        
+        def wait_until(condition):
+            while not condition() and time.monotonic() < deadline:
+                self.connection.process_data_events(time_limit=0.05)
+            return condition()
+        
+        impl.confirm_delivery(ack_nack_callback=on_confirm, callback=lambda frame: selected.append(True))
+        if not wait_until(lambda: selected):
+            raise TimeoutError("RabbitMQ did not enable publisher confirms in time")
+        
+        total = 0
+        for index, message in enumerate(messages):
+            body, properties = self._encode(message)
+            impl.basic_publish(exchange=exchange, routing_key=routing_key, body=body, properties=properties)
+            total += 1
+            # Delivery tags of a fresh confirm-mode channel count up from 1
+            outstanding[total] = index
+            
+            if len(outstanding) >= window and not wait_until(lambda: len(outstanding) < window):
+                raise TimeoutError(f"Timed out waiting for RabbitMQ confirms after {total} messages")
+        
+        wait_until(lambda: not outstanding)
+        return total, nacked, sorted(outstanding.values())
+    
+    def _publish_confirmed(self, channel, messages, exchange, routing_key, deadline):
+        """Publish through the public confirm mode, where each publish waits for its confirm"""
+        channel.confirm_delivery()
+        nacked = []
+        total = 0
+        for index, message in enumerate(messages):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for RabbitMQ confirms after {total} messages")
+            body, properties = self._encode(message)
+            try:
+                channel.basic_publish(exchange=exchange, routing_key=routing_key, body=body, properties=properties)
+            except (pika.exceptions.NackError, pika.exceptions.UnroutableError):
+                nacked.append(index)
+            total += 1
+        return total, nacked, []
+    
+    def _encode(self, message):
+        """Body and persistent delivery properties; strings and bytes are published as they are"""
+        if not isinstance(message, (dict, list)):
+            return message, pika.BasicProperties(delivery_mode=2)
+        body, content_type, content_encoding = self.codec.encode(message)
+        return body, pika.BasicProperties(delivery_mode=2, content_type=content_type,
+                                          content_encoding=content_encoding)
+    
     @keyword('Publish Test Result To RabbitMQ')
-    def publish_test_result_to_rabbitmq(self, queue_name, test_name, status, duration, details=None):
-        """Publish test result to RabbitMQ"""
+    def publish_test_result_to_rabbitmq(self, queue_name, test_name, status, duration, details=None, outbox=False):
+        """Publish test result to RabbitMQ
+        
+        With ``outbox`` the result is appended to the running ResultOutbox,
+        which publishes it in the background, and its result id is returned.
+        """
+        if outbox:
+            return _result_outbox().publish_test_result_to_outbox('rabbitmq', queue_name, test_name, status, duration,
+                                                                  details)
+        
         message = {
             'test_name': test_name,
             'status': status,
             'duration': duration,
-            'timestamp': logger.timestamp(),
+            'timestamp': datetime.now().isoformat(),
             'details': details or {}
         }
         
         return self.publish_message_to_rabbitmq(queue_name, message)
     
     @keyword('Consume Messages From Queue')
-    def consume_messages_from_queue(self, queue_name, max_messages=10, timeout=30):
-        """Consume messages from RabbitMQ queue for validation"""
+    def consume_messages_from_queue(self, queue_name, max_messages=10, timeout=30, prefetch_count=0, ack_every=1):
+        """Consume messages from RabbitMQ queue for validation
+
+        ``prefetch_count`` sets ``basic_qos`` so the broker streams that many
+        unacked messages ahead; ``ack_every`` acknowledges cumulatively
+        (``multiple=True``) once per that many messages. Bodies are decoded
+        by their ``content_type`` and ``content_encoding`` (JSON without).
+        """
+        messages = []
+        
+        try:
+            for properties, body in self._iter_messages_from_queue(queue_name, max_messages, timeout,
+                                                                   prefetch_count, ack_every):
+                messages.append(decode(body, properties.content_type, properties.content_encoding))
+            
+            logger.info(f"Consumed {len(messages)} messages from queue '{queue_name}'")
+            return messages
+            
+        except Exception as e:
+            logger.error(f"Failed to consume messages from queue '{queue_name}': {str(e)}")
+            raise
+    
+    @keyword('Validate Messages From Queue')
+    def validate_messages_from_queue(self, queue_name, required_keys=None, expected=None, max_messages=10,
+                                     timeout=30, prefetch_count=0, ack_every=1, stop_on_match=False):
+        """Validate messages from RabbitMQ queue as they arrive
+
+        Every message must decode (by its content type, JSON by default) and
+        contain ``required_keys``. Messages whose fields equal all of
+        ``expected`` count as matches; with ``stop_on_match`` consumption ends
+        at the first one. Messages are not kept in memory, only counters, the
+        first match and a few invalid samples.
+        """
+        required_keys = list(required_keys or [])
+        expected = dict(expected or {})
+        summary = {'consumed': 0, 'valid': 0, 'invalid': 0, 'matched': 0, 'first_match': None, 'errors': []}
+        stop = lambda: stop_on_match and summary['matched'] > 0
+        
+        try:
+            for properties, body in self._iter_messages_from_queue(queue_name, max_messages, timeout,
+                                                                   prefetch_count, ack_every, stop):
+                summary['consumed'] += 1
+                try:
+                    message = decode(body, properties.content_type, properties.content_encoding)
+                    missing = [key for key in required_keys if key not in message]
+                    if missing:
+                        raise ValueError(f"missing keys {missing}")
+                except Exception as e:
+                    summary['invalid'] += 1
+                    if len(summary['errors']) < 10:
+                        summary['errors'].append(f"message {summary['consumed']}: {str(e)}")
+                    continue
+                
+                summary['valid'] += 1
+                if expected and all(message.get(key) == value for key, value in expected.items()):
+                    summary['matched'] += 1
+                    if summary['first_match'] is None:
+                        summary['first_match'] = message
+            
+            logger.info(f"Validated {summary['consumed']} messages from queue '{queue_name}': "
+                        f"{summary['valid']} valid, {summary['invalid']} invalid, {summary['matched']} matched")
+            return summary
+            
+        except Exception as e:
+            logger.error(f"Failed to validate messages from queue '{queue_name}': {str(e)}")
+            raise
+    
+    def _iter_messages_from_queue(self, queue_name, max_messages=10, timeout=30, prefetch_count=0, ack_every=1,
+                                  stop=None):
+        """Yield ``(properties, body)`` for queued messages without buffering them
+
+        A message is acknowledged only after the caller has moved past it, so
+        a message that fails processing stays unacked and is redelivered.
+        Consumption ends after ``max_messages`` or once ``stop()`` is true.
+        A ``prefetch_count`` only applies to this consume and is reset after.
+        """
         if not self.channel:
             raise RuntimeError("Not connected to RabbitMQ. Use 'Connect To RabbitMQ' first.")
         
-        messages = []
+        max_messages = int(max_messages)
+        ack_every = max(int(ack_every), 1)
+        prefetch_count = int(prefetch_count)
+        if prefetch_count > 0:
+            self.channel.basic_qos(prefetch_count=prefetch_count)
+        
         count = 0
+        last_tag = None
+        unacked = 0
         
         try:
             for method_frame, properties, body in self.channel.consume(queue_name, inactivity_timeout=timeout):
                 if method_frame is None:
                     break
-                    
-                message = json.loads(body.decode('utf-8'))
-                messages.append(message)
                 
-                # Acknowledge the message
-                self.channel.basic_ack(method_frame.delivery_tag)
+                yield properties, body
+                
+                last_tag = method_frame.delivery_tag
+                unacked += 1
                 count += 1
+                if unacked >= ack_every:
+                    self.channel.basic_ack(last_tag, multiple=ack_every > 1)
+                    unacked = 0
                 
-                if count >= max_messages:
+                if count >= max_messages or (stop and stop()):
                     break
-            
+        finally:
+            if unacked:
+                self.channel.basic_ack(last_tag, multiple=True)
             self.channel.cancel()
-            logger.info(f"Consumed {count} messages from queue '{queue_name}'")
-            return messages
-            
-        except Exception as e:
-            logger.error(f"Failed to consume messages from queue '{queue_name}': {str(e)}")
-            raise
+            if prefetch_count > 0:
+                # The channel may be the pooled one other consumers share; 0 is pika's unlimited default
+                self.channel.basic_qos(prefetch_count=0)
     
     @keyword('Close RabbitMQ Connection')
     def close_rabbitmq_connection(self):
         """Close RabbitMQ connection"""
-        if self.connection and not self.connection.is_closed:
+        if self.pool_key:
+            shared_pool.release(self.pool_key, self.pooled_client)
+            self.pool_key = None
+            self.pooled_client = None
+            self.connection = None
+            self.channel = None
+            logger.info("RabbitMQ connection returned to pool")
+        elif self.connection and not self.connection.is_closed:
             self.connection.close()
             self.connection = None
             self.channel = None
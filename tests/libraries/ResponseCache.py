@@ -0,0 +1,134 @@
+import time
+from collections import OrderedDict
+from robot.api.deco import keyword
+from robot.api import logger
+from robot.libraries.BuiltIn import BuiltIn
+from HttpPhaseTimer import endpoint_of
+
+DEFAULT_VARY_HEADERS = ('Accept', 'Accept-Encoding', 'Accept-Language', 'Authorization')
+
+
+def _params_key(params):
+    """Hashable form of ``params`` as requests accepts them
+
+    A dict or a list of pairs becomes sorted ``(name, values)`` pairs, with a
+    list value such as ``{'id': [1, 2]}`` kept in order as a tuple of strings.
+    A query string is used as is.
+    """
+    if not params:
+        return ()
+    if isinstance(params, (str, bytes)):
+        return params
+    items = params.items() if hasattr(params, 'items') else params
+    key = []
+    for name, value in items:
+        values = value if isinstance(value, (list, tuple)) else [value]
+        key.append((str(name), tuple(str(item) for item in values)))
+    return tuple(sorted(key))
+
+
+class ResponseCache:
+    """Opt-in TTL and size bounded LRU cache for idempotent GET requests"""
+    
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+    
+    def __init__(self):
+        self.enabled = False
+        self.ttl = 300.0
+        self.max_entries = 256
+        self.vary_headers = DEFAULT_VARY_HEADERS
+        self.entries = OrderedDict()
+        self.bypassed_test = None
+        self.hits = 0
+        self.misses = 0
+    
+    @keyword('Enable Response Cache')
+    def enable_response_cache(self, ttl=300, max_entries=256, vary_headers=None):
+        """Start caching 'Cached GET' responses
+        
+        Responses are kept for ``ttl`` seconds, at most ``max_entries`` of them
+        (least recently used evicted first). Requests only share an entry when
+        method, session, URL, params and the ``vary_headers`` all match.
+        """
+        self.enabled = True
+        self.ttl = float(ttl)
+        self.max_entries = max(int(max_entries), 1)
+        self.vary_headers = tuple(vary_headers) if vary_headers else DEFAULT_VARY_HEADERS
+        logger.info(f"Response cache enabled (ttl={self.ttl}s, max_entries={self.max_entries})")
+    
+    @keyword('Disable Response Cache')
+    def disable_response_cache(self):
+        """Stop caching and drop every cached response"""
+        self.enabled = False
+        self.clear_response_cache()
+    
+    @keyword('Clear Response Cache')
+    def clear_response_cache(self):
+        """Drop every cached response"""
+        self.entries.clear()
+        logger.info("Response cache cleared")
+    
+    @keyword('Bypass Response Cache For Current Test')
+    def bypass_response_cache_for_current_test(self):
+        """Send every 'Cached GET' of the current test to the server"""
+        self.bypassed_test = BuiltIn().get_variable_value('${TEST NAME}')
+        logger.info(f"Response cache bypassed for test '{self.bypassed_test}'")
+    
+    @keyword('Get Response Cache Stats')
+    def get_response_cache_stats(self):
+        """Return hit, miss and size counters of the cache"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+    
+    @keyword('Cached GET')
+    def cached_get(self, url, params=None, headers=None, expected_status=200, session='httpbin', bypass=False):
+        """GET ``url`` on a RequestsLibrary session, answering from the cache when possible
+        
+        Only successful (2xx) responses are cached. Without 'Enable Response
+        Cache', or with ``bypass``, this is a plain 'GET On Session'.
+        """
+        builtin = BuiltIn()
+        if not self.enabled or bypass or self.bypassed_test == builtin.get_variable_value('${TEST NAME}'):
+            return self._get(session, url, params, headers, expected_status)
+        
+        key = self._key(session, url, params, headers)
+        entry = self.entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self._record_lookup('hit', url)
+            response = entry[1]
+            if str(expected_status).lower() != 'any' and int(expected_status) != response.status_code:
+                raise AssertionError(f"Url: {response.url} Expected status: {response.status_code} != {expected_status}")
+            logger.info(f"Response cache hit for GET {url}")
+            return response
+        
+        self.misses += 1
+        self._record_lookup('miss', url)
+        response = self._get(session, url, params, headers, expected_status)
+        if 200 <= response.status_code < 300:
+            self.entries[key] = (time.monotonic(), response)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return response
+    
+    def _key(self, session, url, params, headers):
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        varied = tuple((name, headers.get(name.lower())) for name in self.vary_headers)
+        return ('GET', session, url, _params_key(params), varied)
+    
+    @staticmethod
+    def _get(session, url, params, headers, expected_status):
+        requests_library = BuiltIn().get_library_instance('RequestsLibrary')
+        return requests_library.get_on_session(session, url, params=params, headers=headers,
+                                               expected_status=str(expected_status))
+    
+    @staticmethod
+    def _record_lookup(result, endpoint):
+        """Count the lookup in MetricsCollector when it is imported in the running suite"""
+        try:
+            metrics = BuiltIn().get_library_instance('MetricsCollector')
+        except Exception:
+            return
+        # Folded like the timing metrics, so query strings and ids do not each add a label value
+        metrics.record_response_cache_lookup(result, endpoint_of(endpoint))
@@ -0,0 +1,501 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from robot.api.deco import keyword
+from robot.api import logger
+from RetryDecorator import RetryPolicy
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows): logs of crashed workers are then only
+    # replayed by a later run with the same worker id
+    fcntl = None
+
+TARGETS = ('kafka', 'rabbitmq')
+
+# Ids of delivered results remembered after the log was emptied, to drop late duplicates
+KEEP_DELIVERED_IDS = 10000
+
+class OutboxLog:
+    """Append-only log of messages waiting to be published, safe to reopen after a crash
+    
+    ``<name>.log`` holds one JSON record per line. ``<name>.offset`` is the
+    position up to which every record was delivered, and ``<name>.delivered``
+    lists ids of later records that were delivered out of order, so a replay
+    sends neither again. The owning process holds an exclusive lock on the
+    log. Once everything is delivered the log is truncated; the ids of the
+    last ``KEEP_DELIVERED_IDS`` delivered records are kept. Records older
+    than ``max_age`` seconds, or the oldest ones beyond ``max_bytes`` of
+    pending records, are given up by 'expire' so a log never grows without
+    bound while the brokers are away.
+    """
+    
+    def __init__(self, path, fsync=False, max_age=None, max_bytes=None):
+        self.path = path
+        self.fsync = fsync
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.offset_path = path[:-len('.log')] + '.offset'
+        self.delivered_path = path[:-len('.log')] + '.delivered'
+        self._lock = threading.Lock()
+        self._file = open(path, 'a+b')
+        if fcntl:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._file.close()
+                raise RuntimeError(f"Outbox log {path} is in use by another process")
+        self._truncate_torn_tail()
+        self.offset = self._read_offset()
+        self.delivered_ids = self._read_delivered()
+        self.delivered = set(self.delivered_ids)
+    
+    def _truncate_torn_tail(self):
+        """Drop a partial last line left by a process killed in the middle of an append"""
+        size = self._file.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        self._file.seek(max(size - 65536, 0))
+        tail = self._file.read()
+        if not tail.endswith(b'\n'):
+            end = size - len(tail) + tail.rfind(b'\n') + 1 if b'\n' in tail else 0
+            self._file.truncate(end)
+            logger.warn(f"Dropped {size - end} bytes of an incomplete record from {self.path}")
+    
+    def _read_offset(self):
+        try:
+            with open(self.offset_path) as f:
+                offset = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+        if offset > self._file.seek(0, os.SEEK_END):
+            # Left behind by a log truncated without its offset, every record in it is pending
+            logger.warn(f"Reset the offset of {self.path}, it pointed past the end of the log")
+            return 0
+        return offset
+    
+    def _read_delivered(self):
+        try:
+            with open(self.delivered_path) as f:
+                return [line.strip() for line in f if line.strip()]
+        except OSError:
+            return []
+    
+    def append(self, record):
+        record = dict(record, queued_at=time.time())
+        line = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+    
+    def pending(self, limit=None):
+        """Return ``(end position, record)`` of undelivered records, oldest first"""
+        records = []
+        seen = set()
+        with self._lock, open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                if limit is not None and len(records) >= limit:
+                    break
+                record = json.loads(line)
+                if record['id'] not in self.delivered and record['id'] not in seen:
+                    seen.add(record['id'])
+                    records.append((f.tell(), record))
+        return records
+    
+    def mark_delivered(self, ids):
+        """Persist that ``ids`` were delivered and move the offset past every delivered record"""
+        if not ids:
+            return
+        with self._lock:
+            with open(self.delivered_path, 'a') as f:
+                f.write(''.join(f"{record_id}\n" for record_id in ids))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self.delivered.update(ids)
+            self.delivered_ids.extend(ids)
+            
+            offset = self.offset
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if json.loads(line)['id'] not in self.delivered:
+                        break
+                    offset = f.tell()
+            
+            if offset == self._file.seek(0, os.SEEK_END):
+                self._compact()
+            elif offset != self.offset:
+                self._write_offset(offset)
+    
+    def expire(self):
+        """Give up pending records beyond ``max_age`` or ``max_bytes`` and return how many"""
+        if self.max_age is None and self.max_bytes is None:
+            return 0
+        oldest = time.time() - self.max_age if self.max_age is not None else None
+        expired = []
+        with self._lock, open(self.path, 'rb') as f:
+            size = self._file.seek(0, os.SEEK_END)
+            f.seek(self.offset)
+            start = self.offset
+            for line in f:
+                record = json.loads(line)
+                too_old = oldest is not None and record.get('queued_at', oldest) < oldest
+                too_big = self.max_bytes is not None and size - start > self.max_bytes
+                if not (too_old or too_big):
+                    break
+                if record['id'] not in self.delivered:
+                    expired.append(record['id'])
+                start = f.tell()
+        # Expired records are recorded like delivered ones, so they are never sent later either
+        self.mark_delivered(expired)
+        if expired:
+            logger.warn(f"Dropped {len(expired)} undelivered results from {self.path} past the outbox retention")
+        return len(expired)
+    
+    def _write_offset(self, offset):
+        # Write then rename, so a crash never leaves a half-written offset
+        with open(self.offset_path + '.tmp', 'w') as f:
+            f.write(str(offset))
+        os.replace(self.offset_path + '.tmp', self.offset_path)
+        self.offset = offset
+    
+    def _compact(self):
+        """Everything is delivered: start over with an empty log"""
+        # Offset first: a crash in between replays delivered records, which their ids then skip
+        self._write_offset(0)
+        self._file.truncate(0)
+        if len(self.delivered_ids) > 2 * KEEP_DELIVERED_IDS:
+            self.delivered_ids = self.delivered_ids[-KEEP_DELIVERED_IDS:]
+            self.delivered = set(self.delivered_ids)
+            with open(self.delivered_path + '.tmp', 'w') as f:
+                f.write(''.join(f"{record_id}\n" for record_id in self.delivered_ids))
+            os.replace(self.delivered_path + '.tmp', self.delivered_path)
+    
+    def close(self, remove=False):
+        with self._lock:
+            if remove:
+                for path in (self.path, self.offset_path, self.delivered_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+            self._file.close()
+
+class KafkaSink:
+    """Publishes outbox records with a Kafka producer of its own"""
+    
+    def __init__(self, bootstrap_servers, **codec):
+        from KafkaProducerLibrary import KafkaProducerLibrary
+        self.library = KafkaProducerLibrary()
+        self.library.connect_to_kafka(bootstrap_servers, **codec)
+    
+    def publish(self, topic, records):
+        report = self.library.publish_messages_to_kafka(topic, [record['message'] for record in records],
+                                                        keys=[record['key'] for record in records])
+        return [records[result['index']]['id'] for result in report['results'] if result['status'] == 'PASS']
+    
+    def close(self):
+        self.library.close_kafka_connection()
+
+class RabbitMQSink:
+    """Publishes outbox records on a RabbitMQ connection of its own, with publisher confirms"""
+    
+    def __init__(self, host, port=5672, username='guest', password='guest', virtual_host='/', **codec):
+        from RabbitMQProducerLibrary import RabbitMQProducerLibrary
+        self.library = RabbitMQProducerLibrary()
+        self.library.connect_to_rabbitmq(host, port, username, password, virtual_host, **codec)
+    
+    def publish(self, queue_name, records):
+        report = self.library.bulk_publish_messages_to_rabbitmq(queue_name, [record['message'] for record in records])
+        failed = set(report['nacked']) | set(report['unconfirmed'])
+        return [record['id'] for index, record in enumerate(records) if index not in failed]
+    
+    def close(self):
+        self.library.close_rabbitmq_connection()
+
+class OutboxRelay:
+    """Drains outbox logs to the brokers in batches from a background thread
+    
+    Sinks are created in the relay thread (pika connections must stay on the
+    thread that opened them) and recreated after a failure, waiting with
+    jittered backoff in between.
+    """
+    
+    def __init__(self, logs, sink_factories, batch_size=100, interval=1.0, policy=None):
+        self.logs = list(logs)
+        self.sink_factories = sink_factories
+        self.batch_size = int(batch_size)
+        self.interval = float(interval)
+        self.policy = policy or RetryPolicy(delay=1.0, backoff=2.0, max_delay=30.0, jitter='full')
+        self.sinks = {}
+        self.delivered = 0
+        self.expired = 0
+        self.failures = 0
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='outbox-relay', daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def wake(self):
+        self._wake.set()
+    
+    def stop(self, timeout=30.0):
+        """Stop the thread after a final drain, waiting at most ``timeout`` seconds"""
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+    
+    def _run(self):
+        sleep = 0.0
+        failures = 0
+        while not self._stopping.is_set():
+            self._wake.wait(sleep or self.interval)
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+            if self._drain():
+                sleep, failures = 0.0, 0
+            else:
+                failures += 1
+                sleep = self.policy.next_delay(failures, sleep)
+        # Final drain: one attempt, whatever is left stays in the log for the next run
+        self._drain()
+        for sink in self.sinks.values():
+            self._close_sink(sink)
+        self.sinks = {}
+    
+    def _drain(self):
+        """Publish everything pending, return False when a batch could not be delivered completely"""
+        for log in list(self.logs):
+            self.expired += log.expire()
+            while True:
+                records = [record for end, record in log.pending(self.batch_size)]
+                if not records:
+                    break
+                delivered = self._publish(records)
+                log.mark_delivered(delivered)
+                self.delivered += len(delivered)
+                if len(delivered) < len(records):
+                    return False
+            
+            if log is not self.logs[0]:
+                # A crashed worker's log, replayed completely
+                self.logs.remove(log)
+                log.close(remove=True)
+                logger.info(f"Replayed outbox log {log.path}")
+        return True
+    
+    def _publish(self, records):
+        groups = {}
+        for record in records:
+            groups.setdefault((record['target'], record['destination']), []).append(record)
+        
+        delivered = []
+        for (target, destination), group in groups.items():
+            try:
+                sink = self.sinks.get(target)
+                if sink is None:
+                    if target not in self.sink_factories:
+                        raise RuntimeError(f"No {target} connection configured for the outbox")
+                    sink = self.sinks[target] = self.sink_factories[target]()
+                delivered += sink.publish(destination, group)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{target} {destination}: {str(e)}"
+                logger.warn(f"Outbox relay failed to publish {len(group)} records to {target} '{destination}': {str(e)}")
+                sink = self.sinks.pop(target, None)
+                if sink:
+                    self._close_sink(sink)
+        return delivered
+    
+    @staticmethod
+    def _close_sink(sink):
+        try:
+            sink.close()
+        except Exception as e:
+            logger.warn(f"Failed to close outbox connection: {str(e)}")
+
+class ResultOutbox:
+    """Durable local outbox that publishes test results to Kafka and RabbitMQ in the background"""
+    
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+    
+    def __init__(self):
+        self.log = None
+        self.relay = None
+    
+    @keyword('Start Result Outbox')
+    def start_result_outbox(self, outbox_dir=None, kafka_servers=None, rabbitmq_host=None, rabbitmq_port=5672,
+                            rabbitmq_username='guest', rabbitmq_password='guest', rabbitmq_virtual_host='/',
+                            batch_size=100, interval=1.0, fsync=False, serializer='json', compression='none',
+                            compression_level=None, min_compress_size=1024, max_age=None, max_bytes=None):
+        """Open this process's outbox log and start relaying it to the configured brokers
+        
+        Results are appended to ``<outbox_dir>/results-<worker>.log``
+        (``ROBOT_OUTBOX_DIR``, default ``history/outbox``) and published in
+        batches of up to ``batch_size`` every ``interval`` seconds. Records
+        left by an earlier run, or by a crashed worker whose log is no longer
+        locked, are replayed first. With ``fsync`` every append is forced to
+        disk. Messages are encoded with ``serializer`` and ``compression``
+        like 'Connect To Kafka' and 'Connect To RabbitMQ' do, so consumers
+        decode outbox results the same way as directly published ones.
+        Results still undelivered after ``max_age`` seconds, or the oldest
+        ones beyond ``max_bytes`` per log, are dropped with a warning; both
+        are unbounded by default. Starting it again while it runs has no
+        effect.
+        """
+        if self.relay:
+            return
+        
+        try:
+            outbox_dir = outbox_dir or os.getenv('ROBOT_OUTBOX_DIR', 'history/outbox')
+            os.makedirs(outbox_dir, exist_ok=True)
+            worker = os.getenv('ROBOT_WORKER_ID', 'main')
+            fsync = str(fsync).lower() in ('true', '1', 'yes')
+            retention = {'max_age': float(max_age) if max_age is not None else None,
+                         'max_bytes': int(max_bytes) if max_bytes is not None else None}
+            try:
+                self.log = OutboxLog(os.path.join(outbox_dir, f"results-{worker}.log"), fsync=fsync, **retention)
+            except RuntimeError:
+                # Another run uses the same worker id at the same time
+                self.log = OutboxLog(os.path.join(outbox_dir, f"results-{worker}-{os.getpid()}.log"), fsync=fsync,
+                                     **retention)
+            
+            codec = {'serializer': serializer, 'compression': compression, 'compression_level': compression_level,
+                     'min_compress_size': min_compress_size}
+            sink_factories = {}
+            if kafka_servers:
+                sink_factories['kafka'] = lambda: KafkaSink(kafka_servers, **codec)
+            if rabbitmq_host:
+                sink_factories['rabbitmq'] = lambda: RabbitMQSink(rabbitmq_host, int(rabbitmq_port), rabbitmq_username,
+                                                                  rabbitmq_password, rabbitmq_virtual_host, **codec)
+            
+            self.relay = OutboxRelay([self.log] + self._orphaned_logs(outbox_dir, **retention), sink_factories,
+                                     batch_size=int(batch_size), interval=float(interval))
+            self.relay.start()
+            atexit.register(self.stop_result_outbox)
+            logger.info(f"Started result outbox at {self.log.path} for {', '.join(sink_factories) or 'no brokers'}")
+        
+        except Exception as e:
+            logger.error(f"Failed to start result outbox: {str(e)}")
+            raise
+    
+    def _orphaned_logs(self, outbox_dir, **retention):
+        """Logs of other workers that nobody holds locked any more, i.e. left by crashed runs"""
+        logs = []
+        for path in sorted(glob.glob(os.path.join(outbox_dir, '*.log'))):
+            if os.path.abspath(path) == os.path.abspath(self.log.path) or not fcntl:
+                continue
+            try:
+                log = OutboxLog(path, **retention)
+            except RuntimeError:
+                continue
+            logger.info(f"Replaying outbox log {path} left by an earlier run")
+            logs.append(log)
+        return logs
+    
+    @keyword('Publish Test Result To Outbox')
+    def publish_test_result_to_outbox(self, target, destination, test_name, status, duration, details=None,
+                                      result_id=None):
+        """Append a test result for ``target`` (kafka or rabbitmq) to the outbox and return its result id
+        
+        Returns as soon as the result is in the local log; the relay publishes
+        it to the Kafka topic or RabbitMQ queue ``destination`` later. The
+        message carries ``result_id`` (a new UUID unless given), and results
+        with an id that was delivered already are not sent again, so
+        consumers can drop the rare duplicate after a crash by that id.
+        """
+        if not self.relay:
+            raise RuntimeError("Result outbox is not running. Use 'Start Result Outbox' first.")
+        target = target.lower()
+        if target not in TARGETS:
+            raise ValueError(f"Unknown outbox target '{target}', expected one of {TARGETS}")
+        if target not in self.relay.sink_factories:
+            raise ValueError(f"Result outbox was started without a {target} connection")
+        
+        try:
+            result_id = str(result_id or uuid.uuid4())
+            self.log.append({
+                'id': result_id,
+                'target': target,
+                'destination': destination,
+                'key': test_name,
+                'message': {
+                    'result_id': result_id,
+                    'test_name': test_name,
+                    'status': status,
+                    'duration': duration,
+                    'timestamp': datetime.now().isoformat(),
+                    'details': details or {}
+                }
+            })
+            logger.info(f"Queued result of '{test_name}' for {target} '{destination}' as {result_id}")
+            return result_id
+        
+        except Exception as e:
+            logger.error(f"Failed to append test result to outbox: {str(e)}")
+            raise
+    
+    @keyword('Flush Result Outbox')
+    def flush_result_outbox(self, timeout=30):
+        """Wait until every queued result was published, failing after ``timeout`` seconds"""
+        if not self.relay:
+            raise RuntimeError("Result outbox is not running. Use 'Start Result Outbox' first.")
+        
+        deadline = time.monotonic() + float(timeout)
+        self.relay.wake()
+        while self._pending_count():
+            if time.monotonic() >= deadline:
+                raise AssertionError(f"{self._pending_count()} results still pending after {timeout}s, "
+                                     f"last error: {self.relay.last_error}")
+            time.sleep(0.05)
+        logger.info("Result outbox is empty")
+    
+    @keyword('Get Result Outbox Status')
+    def get_result_outbox_status(self):
+        """Return the number of pending, delivered and expired results and the last relay error"""
+        if not self.relay:
+            raise RuntimeError("Result outbox is not running. Use 'Start Result Outbox' first.")
+        return {
+            'pending': self._pending_count(),
+            'delivered': self.relay.delivered,
+            'expired': self.relay.expired,
+            'failures': self.relay.failures,
+            'last_error': self.relay.last_error
+        }
+    
+    @keyword('Stop Result Outbox')
+    def stop_result_outbox(self, timeout=30):
+        """Make a final attempt to publish pending results and stop the relay
+        
+        Results that could still not be published stay in the log and are
+        replayed by the next 'Start Result Outbox'.
+        """
+        relay, self.relay = self.relay, None
+        if relay:
+            if not relay.stop(float(timeout)):
+                # Still publishing; the daemon thread ends with the process and the log stays replayable
+                logger.warn(f"Result outbox relay did not stop within {timeout}s")
+                return
+            pending = sum(len(log.pending()) for log in relay.logs)
+            for log in relay.logs:
+                log.close()
+            if pending:
+                logger.warn(f"Stopped result outbox with {pending} results left for the next run")
+            else:
+                logger.info("Stopped result outbox")
+    
+    def _pending_count(self):
+        return sum(len(log.pending()) for log in self.relay.logs)
@@ -1,77 +1,298 @@
+import asyncio
+import fnmatch
 import functools
+import inspect
+import random
+import threading
 import time
 import logging
-from typing import Callable, Type, Union, Tuple
+from typing import Callable, Type, Union, Tuple, Optional, Sequence
 from robot.api.deco import keyword
 from robot.api import logger
 
+try:
+    # Named arguments with non-string values for BuiltIn.run_keyword, RF 7.0.1 and newer
+    from robot.running.model import Argument as _NamedArgument
+except ImportError:
+    _NamedArgument = None
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the endpoint while its circuit breaker is open"""
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker shared by every test in the process
+    
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    for ``reset_timeout`` seconds, then lets a single trial call through
+    (half-open): success closes the circuit, failure opens it again. Other
+    calls made while the trial is in flight are rejected as if still open.
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.trial_started = 0.0
+        self._lock = threading.Lock()
+    
+    def before_call(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == 'open':
+                if now - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"Circuit breaker '{self.name}' is open")
+                self.state = 'half-open'
+            if self.state == 'half-open':
+                # A trial whose caller never reported back is given up after reset_timeout
+                if self.trial_in_flight and now - self.trial_started < self.reset_timeout:
+                    raise CircuitOpenError(f"Circuit breaker '{self.name}' is half-open with a trial call in flight")
+                self.trial_in_flight = True
+                self.trial_started = now
+    
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.trial_in_flight = False
+    
+    def record_failure(self) -> bool:
+        """Count a failure and return True when it trips the breaker open"""
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == 'half-open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for an endpoint, creating it on first use"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, int(failure_threshold), float(reset_timeout))
+        return _breakers[name]
+
+class RetryPolicy:
+    """Backoff schedule with optional jitter and an overall deadline
+    
+    ``jitter`` is ``none`` (plain exponential backoff), ``full`` (uniform
+    between 0 and the exponential delay) or ``decorrelated`` (uniform between
+    ``delay`` and three times the previous sleep). Every delay is capped at
+    ``max_delay``, and no retry is attempted once sleeping would overrun
+    ``deadline`` seconds from the first attempt.
+    """
+    
+    JITTER_MODES = ('none', 'full', 'decorrelated')
+    
+    def __init__(self, max_attempts: int = 3, delay: float = 1.0, backoff: float = 2.0,
+                 max_delay: float = 60.0, jitter: str = 'none', deadline: Optional[float] = None):
+        if jitter not in self.JITTER_MODES:
+            raise ValueError(f"Unknown jitter '{jitter}', expected one of {self.JITTER_MODES}")
+        self.max_attempts = int(max_attempts)
+        self.delay = float(delay)
+        self.backoff = float(backoff)
+        self.max_delay = float(max_delay)
+        self.jitter = jitter
+        self.deadline = None if deadline in (None, '', 'None') else float(deadline)
+    
+    def next_delay(self, attempt: int, previous: float) -> float:
+        """Delay before attempt ``attempt + 1``, given the previous sleep"""
+        exponential = min(self.max_delay, self.delay * self.backoff ** (attempt - 1))
+        if self.jitter == 'full':
+            return random.uniform(0, exponential)
+        if self.jitter == 'decorrelated':
+            return min(self.max_delay, random.uniform(self.delay, max(previous, self.delay) * 3))
+        return exponential
+    
+    def allows(self, started: float, delay: float) -> bool:
+        return self.deadline is None or time.monotonic() - started + delay <= self.deadline
+
+def _record_retry_metrics(tripped: bool = False, endpoint: Optional[str] = None):
+    """Feed retries and breaker trips to MetricsCollector when it is imported in the running suite"""
+    try:
+        from robot.libraries.BuiltIn import BuiltIn
+        builtin = BuiltIn()
+        metrics = builtin.get_library_instance('MetricsCollector')
+        test_name = builtin.get_variable_value('${TEST NAME}', 'Suite')
+        suite_name = builtin.get_variable_value('${SUITE NAME}', '')
+    except Exception:
+        # Not running inside Robot Framework or MetricsCollector is not imported
+        return
+
+    if tripped:
+        metrics.record_circuit_breaker_trip(endpoint, suite_name)
+    else:
+        metrics.record_test_retry(test_name, suite_name)
+
+class _RetryRun:
+    """State of one retried call, shared by the sync and async code paths"""
+    
+    def __init__(self, name: str, policy: RetryPolicy, should_retry: Callable[[Exception], bool],
+                 breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.policy = policy
+        self.should_retry = should_retry
+        self.breaker = breaker
+        self.started = time.monotonic()
+        self.attempt = 1
+        self.sleep = 0.0
+    
+    def before_attempt(self):
+        if self.breaker:
+            self.breaker.before_call()
+        logger.info(f"Attempt {self.attempt}/{self.policy.max_attempts} for {self.name}")
+    
+    def on_success(self):
+        if self.breaker:
+            self.breaker.record_success()
+        if self.attempt > 1:
+            logger.info(f"Success on attempt {self.attempt} for {self.name}")
+    
+    def on_failure(self, error: Exception) -> float:
+        """Return how long to sleep before retrying, or re-raise ``error`` when giving up"""
+        if self.breaker and self.breaker.record_failure():
+            logger.warn(f"Circuit breaker '{self.breaker.name}' opened after {self.breaker.failures} failures")
+            _record_retry_metrics(tripped=True, endpoint=self.breaker.name)
+        
+        if not self.should_retry(error):
+            logger.error(f"{self.name} failed with a non-retryable error: {str(error)}")
+            raise error
+        if self.attempt >= self.policy.max_attempts:
+            logger.error(f"All {self.policy.max_attempts} attempts failed for {self.name}. Last error: {str(error)}")
+            raise error
+        
+        self.sleep = self.policy.next_delay(self.attempt, self.sleep)
+        if not self.policy.allows(self.started, self.sleep):
+            logger.error(f"Retry deadline of {self.policy.deadline}s exceeded for {self.name}. Last error: {str(error)}")
+            raise error
+        
+        logger.warn(f"Attempt {self.attempt} failed for {self.name}: {str(error)}. Retrying in {self.sleep:.2f}s...")
+        _record_retry_metrics()
+        self.attempt += 1
+        return self.sleep
+
 class RetryDecorator:
-    """Custom retry decorator with detailed logging for Robot Framework"""
+    """Custom retry decorator with detailed logging for Robot Framework
+    
+    Works on plain and ``async`` functions; the async variant waits with
+    ``asyncio.sleep`` so other tasks keep running between attempts.
+    """
     
-    def __init__(self, max_attempts: int = 3, delay: float = 1.0, 
-                 backoff: float = 2.0, exceptions: Tuple[Type[Exception], ...] = (Exception,)):
+    def __init__(self, max_attempts: int = 3, delay: float = 1.0,
+                 backoff: float = 2.0, exceptions: Tuple[Type[Exception], ...] = (Exception,),
+                 jitter: str = 'none', max_delay: float = 60.0, deadline: Optional[float] = None,
+                 circuit: Optional[str] = None, failure_threshold: int = 5, reset_timeout: float = 30.0):
         self.max_attempts = max_attempts
         self.delay = delay
         self.backoff = backoff
         self.exceptions = exceptions
-        
+        self.policy = RetryPolicy(max_attempts, delay, backoff, max_delay, jitter, deadline)
+        self.circuit = circuit
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+    
+    def _new_run(self, func: Callable) -> _RetryRun:
+        breaker = get_circuit_breaker(self.circuit, self.failure_threshold, self.reset_timeout) if self.circuit else None
+        return _RetryRun(func.__name__, self.policy, lambda error: isinstance(error, self.exceptions), breaker)
+    
     def __call__(self, func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                run = self._new_run(func)
+                while True:
+                    run.before_attempt()
+                    try:
+                        result = await func(*args, **kwargs)
+                    except Exception as e:
+                        await asyncio.sleep(run.on_failure(e))
+                        continue
+                    run.on_success()
+                    return result
+            return async_wrapper
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            attempt = 1
-            current_delay = self.delay
-            
-            while attempt <= self.max_attempts:
+            run = self._new_run(func)
+            while True:
+                run.before_attempt()
                 try:
-                    logger.info(f"Attempt {attempt}/{self.max_attempts} for {func.__name__}")
                     result = func(*args, **kwargs)
-                    if attempt > 1:
-                        logger.info(f"Success on attempt {attempt} for {func.__name__}")
-                    return result
-                    
-                except self.exceptions as e:
-                    if attempt == self.max_attempts:
-                        logger.error(f"All {self.max_attempts} attempts failed for {func.__name__}. Last error: {str(e)}")
-                        raise
-                    
-                    logger.warn(f"Attempt {attempt} failed for {func.__name__}: {str(e)}. Retrying in {current_delay}s...")
-                    time.sleep(current_delay)
-                    current_delay *= self.backoff
-                    attempt += 1
-                    
-            return None
+                except Exception as e:
+                    time.sleep(run.on_failure(e))
+                    continue
+                run.on_success()
+                return result
         return wrapper
+    
+    @keyword('Retry Keyword')
+    def retry_keyword(self, keyword_name: str, *args, max_attempts: int = 3, delay: float = 1.0,
+                      jitter: str = 'none', max_delay: float = 60.0, deadline: Optional[float] = None,
+                      circuit: Optional[str] = None, retry_on: Union[str, Sequence[str], None] = None,
+                      named: Optional[dict] = None, **kwargs):
+        """Retry a Robot Framework keyword with exponential backoff (see the module level keyword)"""
+        return retry_keyword(keyword_name, *args, max_attempts=max_attempts, delay=delay, jitter=jitter,
+                             max_delay=max_delay, deadline=deadline, circuit=circuit, retry_on=retry_on,
+                             named=named, **kwargs)
+
+def _named_args(kwargs: dict) -> list:
+    """Named arguments in the form ``BuiltIn.run_keyword`` accepts
+
+    Older Robot Framework versions only take ``name=value`` strings, which
+    turn non-string values into their string form.
+    """
+    if _NamedArgument is not None:
+        return [_NamedArgument(name, value) for name, value in kwargs.items()]
+    return [f"{name}={value}" for name, value in kwargs.items()]
 
 @keyword('Retry Keyword')
-def retry_keyword(keyword_name: str, max_attempts: int = 3, delay: float = 1.0):
+def retry_keyword(keyword_name: str, *args, max_attempts: int = 3, delay: float = 1.0,
+                  jitter: str = 'none', max_delay: float = 60.0, deadline: Optional[float] = None,
+                  circuit: Optional[str] = None, retry_on: Union[str, Sequence[str], None] = None,
+                  named: Optional[dict] = None, **kwargs):
     """
     Retry a Robot Framework keyword with exponential backoff
-    
+
     Args:
         keyword_name: Name of the keyword to retry
+        args: Arguments passed to the keyword
         max_attempts: Maximum number of retry attempts
         delay: Initial delay between retries in seconds
+        jitter: 'none', 'full' or 'decorrelated' randomization of the delays
+        max_delay: Upper bound for a single delay in seconds
+        deadline: Overall time budget in seconds for all attempts
+        circuit: Endpoint name whose shared circuit breaker guards the keyword
+        retry_on: Glob patterns of error messages worth retrying, all errors if empty
+        named: Named arguments for the keyword, needed for names that are also retry options (``delay``...)
+        kwargs: Other named arguments passed to the keyword
     """
     from robot.libraries.BuiltIn import BuiltIn
     builtin = BuiltIn()
-    
-    attempt = 1
-    current_delay = delay
-    
-    while attempt <= max_attempts:
+
+    if isinstance(retry_on, str):
+        retry_on = [retry_on]
+    patterns = list(retry_on or [])
+    should_retry = lambda error: not patterns or any(fnmatch.fnmatchcase(str(error), p) for p in patterns)
+
+    policy = RetryPolicy(max_attempts, delay, 2.0, max_delay, jitter, deadline)
+    breaker = get_circuit_breaker(circuit) if circuit else None
+    run = _RetryRun(f"keyword {keyword_name}", policy, should_retry, breaker)
+    args = list(args) + _named_args(dict(named or {}, **kwargs))
+
+    while True:
+        run.before_attempt()
         try:
-            logger.info(f"Executing {keyword_name} - Attempt {attempt}/{max_attempts}")
-            result = builtin.run_keyword(keyword_name)
-            if attempt > 1:
-                logger.info(f"Keyword {keyword_name} succeeded on attempt {attempt}")
-            return result
-            
+            result = builtin.run_keyword(keyword_name, *args)
         except Exception as e:
-            if attempt == max_attempts:
-                logger.error(f"Keyword {keyword_name} failed after {max_attempts} attempts. Error: {str(e)}")
-                raise
-            
-            logger.warn(f"Keyword {keyword_name} failed on attempt {attempt}: {str(e)}. Retrying in {current_delay}s...")
-            time.sleep(current_delay)
-            current_delay *= 2.0
-            attempt += 1
+            time.sleep(run.on_failure(e))
+            continue
+        run.on_success()
+        return result
@@ -0,0 +1,219 @@
+import time
+import xml.etree.ElementTree as ET
+import ijson
+from robot.api.deco import keyword
+from robot.api import logger
+from robot.libraries.BuiltIn import BuiltIn
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Seconds, the same as api.timeout in config.yaml
+DEFAULT_TIMEOUT = 30
+
+def _json_prefix(path):
+    """Translate ``slides[].title`` style paths into ijson prefixes (``slides.item.title``)"""
+    return path.replace('[*]', '[]').replace('[]', '.item').strip('.')
+
+def _scan_json_events(events, keys, prefixes):
+    """Collect which top-level ``keys`` and ``prefixes`` occur in an ijson event stream
+
+    Stops consuming events as soon as everything was seen.
+    """
+    keys_left, prefixes_left = set(keys), set(prefixes)
+    for prefix, event, value in events:
+        if event == 'map_key' and prefix == '':
+            keys_left.discard(value)
+        if event != 'map_key' and event not in ('end_map', 'end_array'):
+            prefixes_left.discard(prefix)
+        if not keys_left and not prefixes_left:
+            break
+    return keys_left, prefixes_left
+
+class _CountingStream:
+    """File-like view over a streamed response body that counts the bytes read"""
+    
+    def __init__(self, response):
+        self.raw = response.raw
+        self.bytes_read = 0
+    
+    def read(self, size=-1):
+        data = self.raw.read(None if size is None or size < 0 else size, decode_content=True)
+        self.bytes_read += len(data)
+        return data
+
+class StreamingValidator:
+    """Validate large JSON, NDJSON and XML response bodies without loading them into memory
+    
+    Requests go through the named RequestsLibrary session without making it
+    the current one. RequestsLibrary does not keep the timeout a session was
+    created with, so every keyword takes its own ``timeout`` and otherwise
+    uses the one given when importing this library.
+    """
+    
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.chunk_size = int(chunk_size)
+        self.timeout = timeout
+    
+    @keyword('Validate Streamed JSON Response')
+    def validate_streamed_json_response(self, url, *expected_keys, paths=None, lines=False, session='httpbin',
+                                        params=None, headers=None, expected_status=200, timeout=None):
+        """Check top-level keys and JSON paths of a response while it is downloaded
+        
+        ``paths`` are dotted paths with ``[]`` for array items, for example
+        ``slideshow.slides[].title``. The body is parsed incrementally and the
+        download stops as soon as every key and path was seen. With ``lines``
+        the body is newline-delimited JSON (as served by ``/stream``) and
+        every record must contain the keys and paths. Returns a summary with
+        the bytes read and the number of records.
+        """
+        prefixes = [_json_prefix(path) for path in (paths or [])]
+        response, start_time = self._open_stream(session, url, params, headers, expected_status, timeout)
+        
+        try:
+            if lines:
+                bytes_read, records = self._validate_json_lines(response, expected_keys, prefixes, paths or [])
+            else:
+                stream = _CountingStream(response)
+                keys_left, prefixes_left = _scan_json_events(ijson.parse(stream), expected_keys, prefixes)
+                self._assert_all_found(url, keys_left, [path for path, prefix in zip(paths or [], prefixes)
+                                                        if prefix in prefixes_left])
+                bytes_read, records = stream.bytes_read, 1
+        
+        except ijson.JSONError as e:
+            logger.error(f"Failed to parse streamed JSON from {url}: {str(e)}")
+            raise AssertionError(f"Response from {url} is not valid JSON: {str(e)}")
+        finally:
+            response.close()
+        
+        return self._summary(url, bytes_read, records, start_time)
+    
+    @keyword('Validate Streamed XML Response')
+    def validate_streamed_xml_response(self, url, *expected_paths, session='httpbin', params=None, headers=None,
+                                       expected_status=200, timeout=None):
+        """Check that element paths occur in an XML response while it is downloaded
+        
+        Paths are slash separated tag names from the root element, optionally
+        ending in an attribute, for example ``slideshow/slide/title`` or
+        ``slideshow/@author``. Elements are discarded once parsed, so memory
+        stays bounded by the nesting depth rather than the body size.
+        """
+        response, start_time = self._open_stream(session, url, params, headers, expected_status, timeout)
+        stream = _CountingStream(response)
+        paths_left = set(expected_paths)
+        elements = 0
+        
+        try:
+            tags = []
+            root = None
+            for event, element in ET.iterparse(stream, events=('start', 'end')):
+                if event == 'start':
+                    tags.append(element.tag)
+                    path = '/'.join(tags)
+                    paths_left.discard(path)
+                    for name in element.attrib:
+                        paths_left.discard(f"{path}/@{name}")
+                    if root is None:
+                        root = element
+                    if not paths_left:
+                        break
+                    continue
+                
+                tags.pop()
+                elements += 1
+                element.clear()
+                if len(tags) == 1:
+                    root.clear()
+            
+            self._assert_all_found(url, [], paths_left)
+        
+        except ET.ParseError as e:
+            logger.error(f"Failed to parse streamed XML from {url}: {str(e)}")
+            raise AssertionError(f"Response from {url} is not valid XML: {str(e)}")
+        finally:
+            response.close()
+        
+        return self._summary(url, stream.bytes_read, elements, start_time)
+    
+    @keyword('Validate Streamed Response Contains')
+    def validate_streamed_response_contains(self, url, *expected_data, session='httpbin', params=None, headers=None,
+                                            expected_status=200, encoding='utf-8', timeout=None):
+        """Check that a response contains every expected string, scanning it chunk by chunk
+        
+        Only the last ``len(longest expected string) - 1`` bytes of the
+        previous chunk are kept, so matches across chunk boundaries are found
+        without buffering the body.
+        """
+        needles = {data: data.encode(encoding) for data in expected_data}
+        overlap = max((len(needle) for needle in needles.values()), default=1) - 1
+        response, start_time = self._open_stream(session, url, params, headers, expected_status, timeout)
+        bytes_read = 0
+        
+        try:
+            tail = b''
+            for chunk in response.iter_content(self.chunk_size):
+                bytes_read += len(chunk)
+                window = tail + chunk
+                for data in [data for data, needle in needles.items() if needle in window]:
+                    del needles[data]
+                if not needles:
+                    break
+                tail = window[-overlap:] if overlap else b''
+        finally:
+            response.close()
+        
+        if needles:
+            raise AssertionError(f"Response from {url} does not contain: {', '.join(needles)}")
+        return self._summary(url, bytes_read, 1, start_time)
+    
+    def _validate_json_lines(self, response, keys, prefixes, paths):
+        bytes_read = 0
+        records = 0
+        for line in response.iter_lines(self.chunk_size):
+            bytes_read += len(line) + 1
+            if not line.strip():
+                continue
+            records += 1
+            keys_left, prefixes_left = _scan_json_events(ijson.parse(line), keys, prefixes)
+            if keys_left or prefixes_left:
+                missing = sorted(keys_left) + [path for path, prefix in zip(paths, prefixes) if prefix in prefixes_left]
+                raise AssertionError(f"Record {records} of {response.url} is missing: {', '.join(missing)}")
+        return bytes_read, records
+    
+    def _open_stream(self, session, url, params, headers, expected_status, timeout=None):
+        """Send a streamed GET through a RequestsLibrary session
+        
+        Goes to the underlying ``requests`` session directly, since the 'GET On
+        Session' keyword logs (and so downloads) the full body.
+        """
+        requests_library = BuiltIn().get_library_instance('RequestsLibrary')
+        # Unlike switch(), get_connection leaves RequestsLibrary's current session alone
+        http_session = requests_library._cache.get_connection(session)
+        timeout = float(timeout if timeout not in (None, '') else self.timeout)
+        start_time = time.monotonic()
+        
+        try:
+            response = http_session.get(requests_library._merge_url(http_session, url), params=params,
+                                        headers=headers, timeout=timeout, stream=True)
+        except Exception as e:
+            logger.error(f"Failed to open streamed request to {url}: {str(e)}")
+            raise
+        
+        if str(expected_status).lower() != 'any' and int(expected_status) != response.status_code:
+            response.close()
+            raise AssertionError(f"Url: {response.url} Expected status: {response.status_code} != {expected_status}")
+        return response, start_time
+    
+    @staticmethod
+    def _assert_all_found(url, keys_left, paths_left):
+        missing = sorted(keys_left) + sorted(paths_left)
+        if missing:
+            raise AssertionError(f"Response from {url} is missing: {', '.join(missing)}")
+    
+    @staticmethod
+    def _summary(url, bytes_read, records, start_time):
+        summary = {
+            'bytes': bytes_read,
+            'records': records,
+            'seconds': round(time.monotonic() - start_time, 3)
+        }
+        logger.info(f"Validated {records} record(s) from {url} after reading {bytes_read} bytes")
+        return summary
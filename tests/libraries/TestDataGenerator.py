@@ -1,120 +1,378 @@
+import os
 import random
-import json
-from datetime import datetime, timedelta
-from faker import Faker
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
 from robot.api.deco import keyword
 from robot.api import logger
-from datetime import datetime
+import LibraryLogger as log
+from LazyImport import lazy_import
+
+# Imported when the first record is generated, not when a suite imports the library
+faker = lazy_import('faker')
+
+# Base seed shared by all workers of a run, see run_seed
+SEED_ENV = 'ROBOT_DATA_SEED'
+# Extra key for workers running the same tests, such as load-test virtual users
+STREAM_ENV = 'ROBOT_DATA_STREAM'
+
+_run_seed = None
+_seed_recorded = False
+
+# Robot creates a library instance per test, they all share one Faker per locale
+_shared_fakers = {}
+# Library instance whose seed stream each shared Faker currently continues
+_faker_owners = {}
+
+def shared_faker(locale):
+    """Return the process-wide Faker instance of ``locale``, creating it on first use"""
+    fake = _shared_fakers.get(locale)
+    if fake is None:
+        fake = _shared_fakers[locale] = faker.Faker(locale)
+    return fake
+
+def derive_seed(*parts):
+    """32-bit seed derived from ``parts``, the same in every process and Python version"""
+    return random.Random(':'.join(str(part) for part in parts)).getrandbits(32)
+
+def resolve_data_seed(seed=None):
+    """``seed`` when given, else ``ROBOT_DATA_SEED``, else a new random seed"""
+    if seed in (None, ''):
+        seed = os.getenv(SEED_ENV)
+    return int(seed) if seed not in (None, '') else random.SystemRandom().getrandbits(32)
+
+def run_seed():
+    """Base seed of this process, see ``resolve_data_seed``"""
+    global _run_seed
+    if _run_seed is None:
+        _run_seed = resolve_data_seed()
+    return _run_seed
+
+def _current_test_key():
+    """``<suite file>.<test>`` of the running test (the suite in setups), None outside Robot
+
+    The suite file name is used rather than the suite's full name, which
+    depends on how a parallel runner grouped the suites.
+    """
+    try:
+        from robot.libraries.BuiltIn import BuiltIn
+        variables = BuiltIn().get_variables()
+    except Exception:
+        return None
+    source = variables.get('${SUITE SOURCE}')
+    suite = Path(source).stem if source else variables.get('${SUITE NAME}')
+    test = variables.get('${TEST NAME}')
+    return f"{suite}.{test}" if test else suite
+
+def _record_run_seed(seed):
+    """Store the base seed as top-level suite metadata once per process, for replays"""
+    global _seed_recorded
+    if _seed_recorded:
+        return
+    try:
+        from robot.libraries.BuiltIn import BuiltIn
+        BuiltIn().set_suite_metadata('Data Seed', str(seed), top=True)
+        _seed_recorded = True
+    except Exception:
+        pass
+
+def _as_datetime_iso(value):
+    """ISO format of a date at midnight, matching the previous strptime output"""
+    return datetime(value.year, value.month, value.day).isoformat()
+
+def _build_user_data(fake):
+    return {
+        'name': fake.name(),
+        'email': fake.email(),
+        'phone': fake.phone_number(),
+        'address': fake.address(),
+        'company': fake.company(),
+        'job_title': fake.job(),
+        'date_of_birth': _as_datetime_iso(fake.date_of_birth(minimum_age=18, maximum_age=80)),
+        'username': fake.user_name(),
+        'password': fake.password(length=12),
+        'ssn': fake.ssn(),
+        'credit_card': fake.credit_card_number(),
+        'uuid': str(fake.uuid4())
+    }
+
+def _build_api_test_data(fake):
+    return {
+        'string_field': fake.text(max_nb_chars=50),
+        'number_field': fake.random_int(min=1, max=1000),
+        'float_field': round(fake.random.uniform(1.0, 100.0), 2),
+        'boolean_field': fake.boolean(),
+        'date_field': _as_datetime_iso(fake.date_object()),
+        'datetime_field': fake.date_time().replace(microsecond=0).isoformat(),
+        'url_field': fake.url(),
+        'ipv4_field': fake.ipv4(),
+        'mac_address_field': fake.mac_address(),
+        'user_agent_field': fake.user_agent(),
+        'file_name_field': fake.file_name(),
+        'mime_type_field': fake.mime_type()
+    }
+
+def _build_http_headers(fake):
+    return {
+        'User-Agent': fake.user_agent(),
+        'Accept': fake.mime_type(),
+        'Accept-Language': f"{fake.language_code()}-{fake.country_code()}",
+        'X-Request-ID': str(fake.uuid4()),
+        'X-Client-Version': f"{fake.random_int(1, 10)}.{fake.random_int(0, 9)}.{fake.random_int(0, 9)}",
+        'X-Custom-Header': fake.word()
+    }
+
+def _build_json_payload(fake, complexity='simple'):
+    if complexity == 'simple':
+        return {
+            'id': fake.random_int(1, 10000),
+            'name': fake.name(),
+            'message': fake.sentence()
+        }
+    elif complexity == 'medium':
+        return {
+            'user': {
+                'id': fake.random_int(1, 10000),
+                'profile': {
+                    'name': fake.name(),
+                    'email': fake.email(),
+                    'preferences': {
+                        'theme': fake.random_element(['dark', 'light']),
+                        'notifications': fake.boolean()
+                    }
+                }
+            },
+            'metadata': {
+                'timestamp': datetime.now().replace(microsecond=0).isoformat(),
+                'version': f"{fake.random_int(1, 5)}.{fake.random_int(0, 9)}"
+            }
+        }
+    else:  # complex
+        return {
+            'users': [
+                {
+                    'id': fake.random_int(1, 1000),
+                    'name': fake.name(),
+                    'contacts': [fake.email() for _ in range(fake.random_int(1, 5))]
+                } for _ in range(fake.random_int(2, 5))
+            ],
+            'settings': {
+                'global': {
+                    'timeout': fake.random_int(10, 300),
+                    'retries': fake.random_int(1, 10)
+                },
+                'features': {feature: fake.boolean() for feature in
+                           ['analytics', 'caching', 'logging', 'monitoring']}
+            }
+        }
+
+# Record kinds that can be pooled, keyed by the name used in 'Create Test Data Pool'
+BUILDERS = {
+    'user': _build_user_data,
+    'api': _build_api_test_data,
+    'headers': _build_http_headers,
+    'simple': lambda fake: _build_json_payload(fake, 'simple'),
+    'medium': lambda fake: _build_json_payload(fake, 'medium'),
+    'complex': lambda fake: _build_json_payload(fake, 'complex'),
+}
+
+def _generate_batch(kind, locale, seed, count):
+    """Generate ``count`` records with a Faker instance of its own (runs in worker processes too)"""
+    # Not the shared instance: seeding it would change the records of every other user
+    fake = faker.Faker(locale)
+    fake.seed_instance(seed)
+    build = BUILDERS[kind]
+    return [build(fake) for _ in range(count)]
+
+class TestDataPool:
+    """Buffer of pre-generated records refilled in the background when it runs low
+    
+    Batch ``n`` is generated from a seed derived from ``(seed, kind, n)``, so a
+    seeded pool serves the same records in the same order on every run,
+    regardless of when the refills happen.
+    """
+    
+    _executor = None
+    
+    def __init__(self, kind, size, locale='en_US', seed=None, refill_at=0.25, use_process=False):
+        if kind not in BUILDERS:
+            raise ValueError(f"Unknown test data kind '{kind}', expected one of {sorted(BUILDERS)}")
+        self.kind = kind
+        self.size = max(int(size), 1)
+        self.locale = locale
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.refill_at = max(int(self.size * float(refill_at)), 1)
+        self.use_process = use_process
+        self.records = deque()
+        self.batches = 0
+        self.lock = threading.Lock()
+        self.refill_thread = None
+        self._refill()
+    
+    def take(self):
+        """Return the next record, refilling synchronously only when the buffer is empty"""
+        while True:
+            with self.lock:
+                if self.records:
+                    record = self.records.popleft()
+                    if len(self.records) < self.refill_at:
+                        self._start_background_refill()
+                    return record
+                refill_thread = self.refill_thread
+            if refill_thread:
+                refill_thread.join()
+            else:
+                self._refill()
+    
+    def _start_background_refill(self):
+        if self.refill_thread is None:
+            self.refill_thread = threading.Thread(target=self._refill, daemon=True)
+            self.refill_thread.start()
+    
+    def _refill(self):
+        try:
+            with self.lock:
+                batch_seed = derive_seed(self.seed, self.kind, self.batches)
+                self.batches += 1
+            if self.use_process:
+                if TestDataPool._executor is None:
+                    TestDataPool._executor = ProcessPoolExecutor(max_workers=1)
+                records = TestDataPool._executor.submit(
+                    _generate_batch, self.kind, self.locale, batch_seed, self.size).result()
+            else:
+                records = _generate_batch(self.kind, self.locale, batch_seed, self.size)
+            with self.lock:
+                self.records.extend(records)
+        finally:
+            with self.lock:
+                if self.refill_thread is threading.current_thread():
+                    self.refill_thread = None
+
+# Pools outlive the per-test library instances so suites can fill them once,
+# keyed by (kind, locale) so libraries imported with another locale get their own
+_pools = {}
 
 class TestDataGenerator:
-    """Custom test data generation library using Faker"""
+    """Custom test data generation library using Faker
+    
+    Every library instance, i.e. every test, continues its own seed stream
+    ``derive_seed(base, test, stream)`` on the shared Faker of its locale.
+    The base is the ``seed`` argument, ``ROBOT_DATA_SEED`` or a random seed
+    recorded as the ``Data Seed`` suite metadata, so a test gets the same
+    data whichever worker runs it and in whatever order, and a failed run is
+    replayed with ``ROBOT_DATA_SEED=<Data Seed>``. ``ROBOT_DATA_STREAM``
+    separates workers that run the same tests.
+    """
     
     def __init__(self, locale='en_US', seed=None):
-        self.fake = Faker(locale)
-        if seed:
-            Faker.seed(seed)
-            random.seed(seed)
+        self.locale = locale
+        self.seed = None if seed in (None, '') else int(seed)
+        self.test_seed = None
+        self._random_state = None
+    
+    @property
+    def base_seed(self):
+        return self.seed if self.seed is not None else run_seed()
+    
+    @property
+    def fake(self):
+        return self._take_shared_faker()
+    
+    def _take_shared_faker(self):
+        """Return the locale's shared Faker positioned in this instance's seed stream"""
+        fake = shared_faker(self.locale)
+        owner = _faker_owners.get(self.locale)
+        if owner is not self:
+            # Another instance, e.g. the suite setup's, used the Faker last: park its stream, resume ours
+            if owner is not None:
+                owner._random_state = fake.random.getstate()
+            _faker_owners[self.locale] = self
+            if self._random_state is None:
+                self._seed_faker(fake, self._derive_test_seed())
+            else:
+                fake.random.setstate(self._random_state)
+        return fake
+    
+    def _derive_test_seed(self):
+        stream = os.getenv(STREAM_ENV)
+        parts = [self.base_seed, _current_test_key() or '']
+        if stream:
+            parts.append(stream)
+        _record_run_seed(self.base_seed)
+        return derive_seed(*parts)
+    
+    def _seed_faker(self, fake, seed):
+        # seed_instance gives the Faker a Random of its own, the global random stays untouched
+        fake.seed_instance(seed)
+        self.test_seed = seed
+        logger.info(f"Test data seed {seed} (Data Seed {self.base_seed})")
+    
+    @keyword('Set Test Data Seed')
+    def set_test_data_seed(self, seed):
+        """Generate the rest of this test's data from ``seed``
+        
+        Replays the data of a single test using the seed logged by its earlier
+        run, instead of the run's base seed.
+        """
+        self._seed_faker(self.fake, int(seed))
+    
+    @keyword('Get Test Data Seed')
+    def get_test_data_seed(self):
+        """Return the seed this test's data is generated from"""
+        self._take_shared_faker()
+        return self.test_seed
+    
+    @keyword('Create Test Data Pool')
+    def create_test_data_pool(self, kind, size=1000, refill_at=0.25, use_process=False, seed=None):
+        """Pre-generate records of ``kind`` (user, api, headers, simple, medium or complex)
+        
+        While a pool exists, the matching 'Generate Random ...' keywords serve
+        records from it instead of building them on demand. The pool refills
+        in the background once fewer than ``refill_at`` of ``size`` records
+        remain; ``use_process`` generates the batches in a worker process.
+        """
+        seed = seed if seed is not None else derive_seed(self.base_seed, 'pool')
+        _pools[(kind, self.locale)] = TestDataPool(kind, size, self.locale, int(seed), refill_at, use_process)
+        logger.info(f"Created '{kind}' test data pool with {size} records")
+    
+    @keyword('Remove Test Data Pool')
+    def remove_test_data_pool(self, kind):
+        """Stop serving ``kind`` records from a pool"""
+        _pools.pop((kind, self.locale), None)
+        logger.info(f"Removed '{kind}' test data pool")
+    
+    def _generate(self, kind, build):
+        pool = _pools.get((kind, self.locale))
+        return pool.take() if pool else build(self.fake)
     
     @keyword('Generate Random User Data')
     def generate_random_user_data(self):
         """Generate random user data for testing"""
-         
-        user_data = {
-            'name': self.fake.name(),
-            'email': self.fake.email(),
-            'phone': self.fake.phone_number(),
-            'address': self.fake.address(),
-            'company': self.fake.company(),
-            'job_title': self.fake.job(),
-            'date_of_birth': datetime.strptime(str(self.fake.date_of_birth(minimum_age=18, maximum_age=80)),"%Y-%m-%d").isoformat(),
-            'username': self.fake.user_name(),
-            'password': self.fake.password(length=12),
-            'ssn': self.fake.ssn(),
-            'credit_card': self.fake.credit_card_number(),
-            'uuid': str(self.fake.uuid4())
-        }
-        logger.info(f"Generated user data: {json.dumps(user_data, indent=2)}")
+        user_data = self._generate('user', _build_user_data)
+        log.info("Generated user data: %s", log.Payload(user_data))
         return user_data
     
     @keyword('Generate Random API Test Data')
     def generate_random_api_test_data(self):
         """Generate random data suitable for API testing"""
-        test_data = {
-            'string_field': self.fake.text(max_nb_chars=50),
-            'number_field': self.fake.random_int(min=1, max=1000),
-            'float_field': round(self.fake.random.uniform(1.0, 100.0), 2),
-            'boolean_field': self.fake.boolean(),
-            'date_field': datetime.strptime(str(self.fake.date()), "%Y-%m-%d").isoformat(),
-            'datetime_field': datetime.strptime(str(self.fake.date_time()), "%Y-%m-%d %H:%M:%S").isoformat(),
-            'url_field': self.fake.url(),
-            'ipv4_field': self.fake.ipv4(),
-            'mac_address_field': self.fake.mac_address(),
-            'user_agent_field': self.fake.user_agent(),
-            'file_name_field': self.fake.file_name(),
-            'mime_type_field': self.fake.mime_type()
-        }
-        logger.info(f"Generated API test data: {json.dumps(test_data, indent=2)}")
+        test_data = self._generate('api', _build_api_test_data)
+        log.info("Generated API test data: %s", log.Payload(test_data))
         return test_data
     
     @keyword('Generate Random HTTP Headers')
     def generate_random_http_headers(self):
         """Generate random HTTP headers for testing"""
-        headers = {
-            'User-Agent': self.fake.user_agent(),
-            'Accept': self.fake.mime_type(),
-            'Accept-Language': f"{self.fake.language_code()}-{self.fake.country_code()}",
-            'X-Request-ID': str(self.fake.uuid4()),
-            'X-Client-Version': f"{self.fake.random_int(1, 10)}.{self.fake.random_int(0, 9)}.{self.fake.random_int(0, 9)}",
-            'X-Custom-Header': self.fake.word()
-        }
-        logger.info(f"Generated HTTP headers: {json.dumps(headers, indent=2)}")
+        headers = self._generate('headers', _build_http_headers)
+        log.info("Generated HTTP headers: %s", log.Payload(headers))
         return headers
     
     @keyword('Generate Random JSON Payload')
     def generate_random_json_payload(self, complexity='simple'):
         """Generate random JSON payload with different complexity levels"""
-        if complexity == 'simple':
-            payload = {
-                'id': self.fake.random_int(1, 10000),
-                'name': self.fake.name(),
-                'message': self.fake.sentence()
-            }
-        elif complexity == 'medium':
-            payload = {
-                'user': {
-                    'id': self.fake.random_int(1, 10000),
-                    'profile': {
-                        'name': self.fake.name(),
-                        'email': self.fake.email(),
-                        'preferences': {
-                            'theme': self.fake.random_element(['dark', 'light']),
-                            'notifications': self.fake.boolean()
-                        }
-                    }
-                },
-                'metadata': {
-                    'timestamp': datetime.strptime(str(datetime.now()), "%Y-%m-%d %H:%M:%S").isoformat(),
-                    'version': f"{self.fake.random_int(1, 5)}.{self.fake.random_int(0, 9)}"
-                }
-            }
-        else:  # complex
-            payload = {
-                'users': [
-                    {
-                        'id': self.fake.random_int(1, 1000),
-                        'name': self.fake.name(),
-                        'contacts': [self.fake.email() for _ in range(self.fake.random_int(1, 5))]
-                    } for _ in range(self.fake.random_int(2, 5))
-                ],
-                'settings': {
-                    'global': {
-                        'timeout': self.fake.random_int(10, 300),
-                        'retries': self.fake.random_int(1, 10)
-                    },
-                    'features': {feature: self.fake.boolean() for feature in 
-                               ['analytics', 'caching', 'logging', 'monitoring']}
-                }
-            }
+        kind = complexity if complexity in ('simple', 'medium') else 'complex'
+        payload = self._generate(kind, BUILDERS[kind])
         
-        logger.info(f"Generated {complexity} JSON payload: {json.dumps(payload, indent=2)}")
+        log.info("Generated %s JSON payload: %s", complexity, log.Payload(payload))
         return payload
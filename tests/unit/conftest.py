@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# The libraries import each other as top-level modules, like Robot's pythonpath
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'libraries'))
+# The scripts import their siblings the same way when run from the scripts directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / 'scripts'))
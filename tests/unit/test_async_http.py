@@ -0,0 +1,93 @@
+"""AsyncHttpLibrary against a threaded HTTP server on localhost"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from AsyncHttpLibrary import AsyncHttpLibrary
+
+
+class Handler(BaseHTTPRequestHandler):
+    """``/<status>/<delay ms>`` answers with ``status`` after ``delay``, ``/drop`` closes the connection"""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.handled += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if self.path == '/drop':
+                self.close_connection = True
+                return
+            status, delay = self.path.strip('/').split('/')
+            time.sleep(int(delay) / 1000)
+            body = self.path.encode()
+            self.send_response(int(status))
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.handled = server.in_flight = server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def library(server):
+    library = AsyncHttpLibrary()
+    library.create_async_session('local', f"http://127.0.0.1:{server.server_address[1]}", timeout=5)
+    yield library
+    library.delete_all_async_sessions()
+
+
+def test_responses_come_back_in_request_order(library):
+    # Earlier requests take longer, so they finish last
+    requests = [{'url': f"/200/{delay}"} for delay in (150, 100, 50, 0)]
+    responses = library.send_requests_concurrently('local', requests, concurrency=4)
+    assert [response.text for response in responses] == [request['url'] for request in requests]
+
+
+def test_in_flight_requests_never_exceed_concurrency(library, server):
+    library.send_requests_concurrently('local', [{'url': '/200/50'}] * 12, concurrency=3)
+    assert server.handled == 12
+    assert 1 < server.max_in_flight <= 3
+
+
+def test_failures_are_reported_together_after_every_request(library, server):
+    requests = [
+        {'url': '/500/0', 'expected_status': 200},
+        {'url': '/drop'},
+        {'url': '/200/100', 'expected_status': 200},
+        {'url': '/404/0', 'expected_status': 'any'}
+    ]
+    with pytest.raises(AssertionError) as error:
+        library.send_requests_concurrently('local', requests, concurrency=4)
+    assert server.handled == 4
+    message = str(error.value)
+    assert 'request 0 (GET /500/0): expected status 200, got 500' in message
+    assert 'request 1 (GET /drop)' in message
+    assert 'request 2' not in message and 'request 3' not in message
+
+
+def test_transport_errors_can_be_returned_in_place(library):
+    responses = library.send_requests_concurrently('local', [{'url': '/drop'}, {'url': '/200/0'}],
+                                                   return_exceptions=True)
+    assert isinstance(responses[0], Exception)
+    assert responses[1].status_code == 200
@@ -0,0 +1,46 @@
+"""ConnectionPool health checks and release of replaced clients"""
+from ConnectionPool import ConnectionPool, credentials_digest
+
+
+class Client:
+
+    def __init__(self):
+        self.healthy = True
+        self.closed = False
+
+
+def borrow(pool, key=('test',)):
+    client, _ = pool.borrow(key, Client, health_check=lambda client: client.healthy,
+                            closer=lambda client: setattr(client, 'closed', True))
+    return client
+
+
+def test_unhealthy_client_is_closed_when_not_borrowed():
+    pool = ConnectionPool()
+    first = borrow(pool)
+    pool.release(('test',), first)
+    first.healthy = False
+    second = borrow(pool)
+    assert second is not first
+    assert first.closed
+
+
+def test_unhealthy_client_stays_open_until_its_last_borrower_releases_it():
+    pool = ConnectionPool()
+    first = borrow(pool)
+    first.healthy = False
+    second = borrow(pool)
+    assert second is not first
+    assert not first.closed
+    pool.release(('test',), second)
+    assert not first.closed
+    pool.release(('test',), first)
+    assert first.closed
+    assert not second.closed
+
+
+def test_credentials_digest_hides_the_password():
+    digest = credentials_digest('guest', 's3cret')
+    assert 's3cret' not in digest
+    assert digest == credentials_digest('guest', 's3cret')
+    assert digest != credentials_digest('guest', 'other')
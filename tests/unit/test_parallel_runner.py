@@ -0,0 +1,23 @@
+"""Tag filters of the jobs parallel_runner splits a run into"""
+from parallel_runner import build_jobs, parse_args
+
+
+def jobs_for(tmp_path, *argv):
+    (tmp_path / 'api_tests.robot').write_text('*** Test Cases ***\nT\n    No Operation\n')
+    return {job.name: (job.include, job.exclude)
+            for job in build_jobs(parse_args(['--tests-dir', str(tmp_path), *argv]))}
+
+
+def test_shard_tags_narrow_the_user_includes(tmp_path):
+    jobs = jobs_for(tmp_path, '--include', 'smoke', '--include', 'regression', '--exclude', 'slow',
+                    '--shard-tags', 'auth,kafka')
+    assert jobs == {
+        'api_tests-auth': (['smokeANDauth', 'regressionANDauth'], ['slow']),
+        'api_tests-kafka': (['smokeANDkafka', 'regressionANDkafka'], ['slow', 'auth']),
+        'api_tests-rest': (['smoke', 'regression'], ['slow', 'auth', 'kafka'])
+    }
+
+
+def test_shard_tags_without_includes_select_by_tag(tmp_path):
+    jobs = jobs_for(tmp_path, '--shard-tags', 'auth')
+    assert jobs == {'api_tests-auth': (['auth'], []), 'api_tests-rest': ([], ['auth'])}
@@ -0,0 +1,150 @@
+"""Bulk Publish Messages To RabbitMQ against in-process pika channel fakes"""
+import pika
+import pika.exceptions
+import pika.spec
+import pytest
+
+import RabbitMQProducerLibrary as rabbitmq
+
+
+class Frame:
+
+    def __init__(self, method):
+        self.method = method
+
+
+class FakeAsyncChannel:
+    """Confirms deliveries on each event poll: nacks ``nack_tags`` and never confirms ``lost_tags``"""
+
+    def __init__(self, nack_tags=(), lost_tags=(), select_ok=True):
+        self.nack_tags = set(nack_tags)
+        self.lost_tags = set(lost_tags)
+        self.select_ok = select_ok
+        self.delivery_tag = 0
+        self.pending = []
+        self.on_confirm = None
+        self.on_select = None
+
+    def confirm_delivery(self, ack_nack_callback=None, callback=None):
+        self.on_confirm = ack_nack_callback
+        self.on_select = callback
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        self.delivery_tag += 1
+        if self.delivery_tag not in self.lost_tags:
+            self.pending.append(self.delivery_tag)
+
+    def process_events(self):
+        if self.on_select and self.select_ok:
+            self.on_select(Frame(pika.spec.Confirm.SelectOk()))
+            self.on_select = None
+        pending, self.pending = self.pending, []
+        for tag in pending:
+            method = pika.spec.Basic.Nack if tag in self.nack_tags else pika.spec.Basic.Ack
+            self.on_confirm(Frame(method(delivery_tag=tag, multiple=False)))
+
+
+class FakeChannel:
+
+    def __init__(self, impl=None):
+        if impl is not None:
+            self._impl = impl
+        self.is_open = True
+        self.confirming = False
+        self.published = []
+        self.nack_indexes = set()
+
+    def confirm_delivery(self):
+        self.confirming = True
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        index = len(self.published)
+        self.published.append(body)
+        if self.confirming and index in self.nack_indexes:
+            raise pika.exceptions.NackError([])
+
+    def close(self):
+        self.is_open = False
+
+
+class FakeConnection:
+
+    def __init__(self, channel):
+        self._channel = channel
+        self.is_open = True
+
+    def channel(self):
+        return self._channel
+
+    def process_data_events(self, time_limit=0):
+        impl = getattr(self._channel, '_impl', None)
+        if impl:
+            impl.process_events()
+
+
+def connected_library(channel):
+    library = rabbitmq.RabbitMQProducerLibrary()
+    library.connection = FakeConnection(channel)
+    library.channel = channel
+    return library
+
+
+def messages(count):
+    return [{'index': index} for index in range(count)]
+
+
+def test_all_messages_acked():
+    channel = FakeChannel(FakeAsyncChannel())
+    report = connected_library(channel).bulk_publish_messages_to_rabbitmq('q', messages(25), window=10)
+    assert report['total'] == 25
+    assert report['confirmed'] == 25
+    assert report['nacked'] == [] and report['unconfirmed'] == []
+    assert channel._impl.delivery_tag == 25
+    assert not channel.is_open
+
+
+def test_nacked_messages_are_reported_by_index():
+    channel = FakeChannel(FakeAsyncChannel(nack_tags={2, 5}))
+    report = connected_library(channel).bulk_publish_messages_to_rabbitmq('q', messages(6), window=3)
+    assert report['nacked'] == [1, 4]
+    assert report['confirmed'] == 4
+
+
+def test_unconfirmed_messages_after_timeout():
+    channel = FakeChannel(FakeAsyncChannel(lost_tags={4}))
+    report = connected_library(channel).bulk_publish_messages_to_rabbitmq('q', messages(5), window=10, timeout=0.2)
+    assert report['unconfirmed'] == [3]
+    assert report['confirmed'] == 4
+
+
+def test_full_window_times_out():
+    channel = FakeChannel(FakeAsyncChannel(lost_tags={1, 2}))
+    library = connected_library(channel)
+    with pytest.raises(TimeoutError, match='after 2 messages'):
+        library.bulk_publish_messages_to_rabbitmq('q', messages(5), window=2, timeout=0.2)
+    assert not channel.is_open
+
+
+def test_confirm_mode_not_enabled_times_out():
+    channel = FakeChannel(FakeAsyncChannel(select_ok=False))
+    with pytest.raises(TimeoutError, match='publisher confirms'):
+        connected_library(channel).bulk_publish_messages_to_rabbitmq('q', messages(1), timeout=0.1)
+
+
+def test_unknown_pika_version_uses_public_confirms(monkeypatch):
+    monkeypatch.setattr(pika, '__version__', '2.0.0')
+    channel = FakeChannel(FakeAsyncChannel())
+    channel.nack_indexes = {1}
+    report = connected_library(channel).bulk_publish_messages_to_rabbitmq('q', messages(3))
+    assert channel.confirming
+    assert channel._impl.delivery_tag == 0
+    assert report['nacked'] == [1]
+    assert report['confirmed'] == 2
+
+
+def test_channel_without_async_channel_uses_public_confirms():
+    channel = FakeChannel()
+    report = connected_library(channel).bulk_publish_messages_to_rabbitmq('q', messages(3))
+    assert channel.confirming
+    assert len(channel.published) == 3
+    assert report['confirmed'] == 3
@@ -0,0 +1,45 @@
+"""Consume Messages From Queue against an in-process pika channel fake"""
+import RabbitMQProducerLibrary as rabbitmq
+
+
+class Method:
+
+    def __init__(self, delivery_tag):
+        self.delivery_tag = delivery_tag
+
+
+class Properties:
+    content_type = None
+    content_encoding = None
+
+
+class FakeChannel:
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.prefetch_count = 0
+        self.acked = []
+
+    def basic_qos(self, prefetch_count=0):
+        self.prefetch_count = prefetch_count
+
+    def consume(self, queue, inactivity_timeout=None):
+        for tag, body in enumerate(self.bodies, 1):
+            yield Method(tag), Properties(), body
+        yield None, None, None
+
+    def basic_ack(self, delivery_tag, multiple=False):
+        self.acked.append((delivery_tag, multiple))
+
+    def cancel(self):
+        pass
+
+
+def test_prefetch_count_is_reset_after_consuming():
+    channel = FakeChannel([b'{"id": 1}', b'{"id": 2}', b'{"id": 3}'])
+    library = rabbitmq.RabbitMQProducerLibrary()
+    library.channel = channel
+    messages = library.consume_messages_from_queue('q', max_messages=10, prefetch_count=50, ack_every=2)
+    assert [message['id'] for message in messages] == [1, 2, 3]
+    assert channel.acked == [(2, True), (3, True)]
+    assert channel.prefetch_count == 0
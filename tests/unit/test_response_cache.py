@@ -0,0 +1,39 @@
+"""ResponseCache keys and lookup metrics"""
+import ResponseCache as ResponseCache_module
+from ResponseCache import ResponseCache
+
+
+def key(params, headers=None):
+    return ResponseCache()._key('httpbin', '/get', params, headers)
+
+
+def test_list_param_values_are_hashable():
+    assert hash(key({'id': [1, 2], 'q': 'x'}))
+
+
+def test_param_order_does_not_matter_but_value_order_does():
+    assert key({'a': 1, 'b': [1, 2]}) == key({'b': [1, 2], 'a': '1'})
+    assert key({'b': [1, 2]}) != key({'b': [2, 1]})
+
+
+def test_pairs_and_query_strings_are_accepted():
+    assert key([('a', 1), ('b', 2)]) == key({'b': 2, 'a': 1})
+    assert key('a=1&b=2') != key('a=2&b=1')
+    assert key(None) == key({})
+
+
+def test_lookups_are_counted_per_folded_endpoint(monkeypatch):
+    lookups = []
+
+    class Metrics:
+        def record_response_cache_lookup(self, result, endpoint):
+            lookups.append((result, endpoint))
+
+    class FakeBuiltIn:
+        def get_library_instance(self, name):
+            return Metrics()
+
+    monkeypatch.setattr(ResponseCache_module, 'BuiltIn', FakeBuiltIn)
+    ResponseCache._record_lookup('hit', '/bytes/512?seed=3')
+    ResponseCache._record_lookup('miss', 'https://httpbin.org/get?page=2')
+    assert lookups == [('hit', '/bytes/{n}'), ('miss', '/get')]
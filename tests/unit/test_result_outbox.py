@@ -0,0 +1,110 @@
+"""ResultOutbox sink codecs and retention of undelivered results"""
+import os
+
+import KafkaProducerLibrary
+import RabbitMQProducerLibrary
+import ResultOutbox
+from ResultOutbox import KafkaSink, OutboxLog, RabbitMQSink
+
+CODEC = {'serializer': 'compact-json', 'compression': 'gzip', 'compression_level': 6, 'min_compress_size': 0}
+
+
+def record_connect(monkeypatch, library, method):
+    calls = []
+    monkeypatch.setattr(library, method, lambda self, *args, **kwargs: calls.append((args, kwargs)))
+    return calls
+
+
+def test_kafka_sink_passes_codec(monkeypatch):
+    calls = record_connect(monkeypatch, KafkaProducerLibrary.KafkaProducerLibrary, 'connect_to_kafka')
+    KafkaSink('localhost:9092', **CODEC)
+    assert calls == [(('localhost:9092',), CODEC)]
+
+
+def test_rabbitmq_sink_passes_codec(monkeypatch):
+    calls = record_connect(monkeypatch, RabbitMQProducerLibrary.RabbitMQProducerLibrary, 'connect_to_rabbitmq')
+    RabbitMQSink('localhost', 5672, 'guest', 'guest', '/', **CODEC)
+    assert calls == [(('localhost', 5672, 'guest', 'guest', '/'), CODEC)]
+
+
+def test_expire_drops_records_past_max_age(tmp_path, monkeypatch):
+    log = OutboxLog(str(tmp_path / 'results.log'), max_age=60)
+    monkeypatch.setattr(ResultOutbox.time, 'time', lambda: 1000.0)
+    log.append({'id': 'old'})
+    monkeypatch.setattr(ResultOutbox.time, 'time', lambda: 1050.0)
+    log.append({'id': 'new'})
+    monkeypatch.setattr(ResultOutbox.time, 'time', lambda: 1070.0)
+    assert log.expire() == 1
+    assert [record['id'] for end, record in log.pending()] == ['new']
+
+
+def test_expire_keeps_pending_records_within_max_bytes(tmp_path):
+    log = OutboxLog(str(tmp_path / 'results.log'), max_bytes=200)
+    for index in range(10):
+        log.append({'id': str(index), 'message': 'x' * 40})
+    assert log.expire() > 0
+    pending = log.pending()
+    assert pending[-1][1]['id'] == '9'
+    assert os.path.getsize(log.path) - log.offset <= 200
+
+
+class Crash(Exception):
+    pass
+
+
+class Compaction:
+    """Lets the first step of a log compaction happen and crashes on the second"""
+
+    def __init__(self, log):
+        self.file = log._file
+        self.steps = 0
+
+    def step(self):
+        self.steps += 1
+        if self.steps > 1:
+            raise Crash()
+
+    def truncate(self, size=None):
+        self.step()
+        return self.file.truncate(size)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def test_crash_while_compacting_replays_nothing_twice(tmp_path, monkeypatch):
+    path = str(tmp_path / 'results.log')
+    log = OutboxLog(path)
+    log.append({'id': 'a', 'message': 'x' * 100})
+    log.append({'id': 'b', 'message': 'x' * 100})
+    log.mark_delivered(['a'])
+    log._file = compaction = Compaction(log)
+    write_offset = OutboxLog._write_offset
+
+    def crashing_write_offset(self, offset):
+        compaction.step()
+        write_offset(self, offset)
+
+    monkeypatch.setattr(OutboxLog, '_write_offset', crashing_write_offset)
+    try:
+        log.mark_delivered(['b'])
+    except Crash:
+        pass
+    compaction.file.close()
+    monkeypatch.undo()
+
+    log = OutboxLog(path)
+    log.append({'id': 'c'})
+    assert [record['id'] for end, record in log.pending()] == ['c']
+
+
+def test_offset_past_the_end_of_the_log_is_reset(tmp_path):
+    path = str(tmp_path / 'results.log')
+    log = OutboxLog(path)
+    log.append({'id': 'a', 'message': 'x' * 100})
+    log._write_offset(1000)
+    log._file.close()
+
+    log = OutboxLog(path)
+    assert log.offset == 0
+    assert [record['id'] for end, record in log.pending()] == ['a']